@@ -0,0 +1,538 @@
+"""
+backtest.py
+Vectorized replay of the signal strategies over stored tick history, scored
+as binary options: every signal is settled against the last price at or
+before decision time + expiration.
+- Run: python backtest.py frxEURUSD --timeframe 1m --expiration 2m [--strategy sma] [--journal journal]
+- Ticks come from the TickJournal files (<journal>/<symbol>.ticks) or, from
+  the console `backtest` command, from the ticks held in MarketData.
+- Signals at every decision point and their outcomes are computed with
+  cumulative sums and searchsorted lookups on the timestamp column; there is
+  no per-tick Python loop, so millions of ticks replay in seconds.
+- Sweep a grid of sma lengths, timeframes and expirations across a process pool:
+    python backtest.py frxEURUSD --sweep --fast 3,5,8 --slow 20,30,60 --timeframe 30s,1m --expiration 1m,2m
+- Walk-forward optimization (folds in parallel) for every SYMBOL_MAP symbol, e.g. overnight:
+    python backtest.py --walk-forward --train 6h --test 1h --report walk_forward.json
+- A BUY wins when the expiry price is above the entry price, a SELL when it
+  is below; equal prices are draws (stake refunded). A win pays `payout` per
+  unit staked, a loss costs the stake.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import indicators
+
+# Fraction of the stake paid on a winning option
+DEFAULT_PAYOUT = 0.85
+
+BUY, HOLD, SELL = 1, 0, -1
+
+# Default sweep grid (sma lengths in ticks, durations in seconds) and the fewest
+# trades a combination needs to be ranked
+SWEEP_FAST = [3, 5, 8, 10, 15, 20, 30]
+SWEEP_SLOW = [20, 30, 45, 60, 90, 120, 180]
+SWEEP_EXPIRATIONS = [60, 120, 300]
+SWEEP_MIN_TRADES = 30
+# Walk-forward: a combination counts towards a stable region in a fold when it ranks
+# within this top fraction of the fold's in-sample sweep
+STABLE_TOP_FRACTION = 0.1
+
+
+def load_journal(symbol, directory="journal"):
+    """Read a TickJournal file into (timestamps, prices) float64 arrays, sorted by time."""
+    data = np.fromfile(os.path.join(directory, symbol + ".ticks"), dtype="<f8")
+    data = data[:len(data) // 2 * 2].reshape(-1, 2)  # ignore a torn trailing record
+    ts = np.ascontiguousarray(data[:, 0], dtype=np.float64)
+    prices = np.ascontiguousarray(data[:, 1], dtype=np.float64)
+    if len(ts) > 1 and np.any(ts[1:] < ts[:-1]):
+        order = np.argsort(ts, kind="stable")
+        ts, prices = ts[order], prices[order]
+    return ts, prices
+
+
+def window_counts(ts, tf_seconds):
+    """Ticks in the window (t[i] - tf_seconds, t[i]] seen by a decision at each tick i."""
+    return np.arange(1, len(ts) + 1) - np.searchsorted(ts, ts - tf_seconds, side="left")
+
+
+# ========== SIGNALS ==========
+# Each function returns one int8 per tick: BUY (1), SELL (-1) or HOLD (0), as the
+# matching signal_bot strategy would answer with the ticks up to that point.
+def sma_signals(ts, prices, tf_seconds, fast_len=5, slow_len=20, fast_ma=None, slow_ma=None, count=None):
+    """
+    compute_signal at every tick. fast_ma/slow_ma (indicators.sma series) and
+    count (window_counts) may be passed precomputed.
+    """
+    x = indicators.as_array(prices)
+    out = np.zeros(len(x), dtype=np.int8)
+    if len(x) < 3:
+        return out
+    if fast_ma is None:
+        fast_ma = indicators.sma(x, fast_len)
+    if slow_ma is None:
+        slow_ma = indicators.sma(x, slow_len)
+    if count is None:
+        count = window_counts(ts, tf_seconds)
+    ok = (count >= max(fast_len, slow_len, 3))
+    slope = np.zeros(len(x))
+    slope[2:] = (x[2:] - x[:-2]) / 2.0
+    with np.errstate(invalid="ignore"):
+        out[ok & (fast_ma > slow_ma) & (slope > 0)] = BUY
+        out[ok & (fast_ma < slow_ma) & (slope < 0)] = SELL
+    return out
+
+
+def rsi_signals(ts, prices, tf_seconds, length=14, oversold=30, overbought=70):
+    # Wilder smoothing runs over the whole replay instead of restarting at each window
+    x = indicators.as_array(prices)
+    value = indicators.rsi(x, length)
+    ok = window_counts(ts, tf_seconds) > length
+    out = np.zeros(len(x), dtype=np.int8)
+    with np.errstate(invalid="ignore"):
+        out[ok & (value < oversold)] = BUY
+        out[ok & (value > overbought)] = SELL
+    return out
+
+
+def macd_signals(ts, prices, tf_seconds, fast=12, slow=26, signal=9):
+    # EMAs run over the whole replay instead of restarting at each window
+    x = indicators.as_array(prices)
+    _, _, hist = indicators.macd(x, fast, slow, signal)
+    ok = window_counts(ts, tf_seconds) >= slow + signal
+    out = np.zeros(len(x), dtype=np.int8)
+    if len(x) < 2:
+        return out
+    rising = np.zeros(len(x), dtype=bool)
+    rising[1:] = hist[1:] > hist[:-1]
+    falling = np.zeros(len(x), dtype=bool)
+    falling[1:] = hist[1:] < hist[:-1]
+    out[ok & (hist > 0) & rising] = BUY
+    out[ok & (hist < 0) & falling] = SELL
+    return out
+
+
+def bollinger_signals(ts, prices, tf_seconds, length=20, width=2.0):
+    x = indicators.as_array(prices)
+    _, upper, lower = indicators.bollinger(x, length, width)
+    ok = window_counts(ts, tf_seconds) >= length
+    out = np.zeros(len(x), dtype=np.int8)
+    with np.errstate(invalid="ignore"):
+        out[ok & (x < lower)] = BUY
+        out[ok & (x > upper)] = SELL
+    return out
+
+
+# strategy name (as in signal_bot.STRATEGIES) -> function(ts, prices, tf_seconds, **params)
+SIGNALS = {
+    "sma": sma_signals,
+    "rsi": rsi_signals,
+    "macd": macd_signals,
+    "bollinger": bollinger_signals,
+}
+
+
+# ========== SCORING ==========
+def decision_points(ts, every=0):
+    """Tick indices signals are taken at: every tick, or the last tick of each `every`-second step."""
+    if every <= 0 or not len(ts):
+        return np.arange(len(ts))
+    grid = np.arange(ts[0] - ts[0] % every + every, ts[-1] + every, every)
+    idx = np.searchsorted(ts, grid, side="left") - 1
+    return np.unique(idx[idx >= 0])
+
+
+def settlement_moves(ts, prices, exp_seconds):
+    """Price change from each tick to its settlement exp_seconds later (NaN when past the last tick)."""
+    ts = indicators.as_array(ts)
+    x = indicators.as_array(prices)
+    # settlement price: last tick at or before expiry
+    settle = np.searchsorted(ts, ts + exp_seconds, side="right") - 1
+    move = x[settle] - x
+    if len(ts):
+        move[ts + exp_seconds > ts[-1]] = np.nan
+    return move
+
+
+def score(ts, prices, signals, exp_seconds, payout=DEFAULT_PAYOUT, points=None, moves=None):
+    """
+    Settle the non-HOLD signals at `points` (default: every tick) after
+    exp_seconds. Signals whose expiry lies beyond the last tick are counted
+    as unresolved. moves may be passed precomputed (settlement_moves).
+    Returns a summary dict.
+    """
+    if points is None:
+        points = np.arange(len(signals))
+    points = points[signals[points] != HOLD]
+    if moves is None:
+        # only the signalled ticks need settling
+        ts = indicators.as_array(ts)
+        x = indicators.as_array(prices)
+        expiry = ts[points] + exp_seconds
+        settle = np.searchsorted(ts, expiry, side="right") - 1
+        move = np.where(expiry <= ts[-1], x[settle] - x[points], np.nan) if len(ts) else np.zeros(0)
+    else:
+        move = moves[points]
+    resolved = ~np.isnan(move)
+    points = points[resolved]
+    move = move[resolved] * signals[points]
+    wins = int(np.count_nonzero(move > 0))
+    losses = int(np.count_nonzero(move < 0))
+    trades = len(points)
+    draws = trades - wins - losses
+    pnl = wins * payout - losses
+    decided = wins + losses
+    return {
+        "trades": trades,
+        "buys": int(np.count_nonzero(signals[points] == BUY)),
+        "sells": int(np.count_nonzero(signals[points] == SELL)),
+        "wins": wins,
+        "losses": losses,
+        "draws": draws,
+        "unresolved": len(resolved) - trades,
+        "win_rate": wins / decided if decided else float("nan"),
+        # win rate needed to break even at this payout
+        "breakeven": 1.0 / (1.0 + payout),
+        "pnl": pnl,
+        "return_per_trade": pnl / trades if trades else 0.0,
+    }
+
+
+def run_backtest(ts, prices, strategy="sma", tf_seconds=60, exp_seconds=120,
+                 payout=DEFAULT_PAYOUT, every=0, **params):
+    """Replay one strategy over (ts, prices) and score it; params go to the SIGNALS function."""
+    ts = indicators.as_array(ts)
+    prices = indicators.as_array(prices)
+    if strategy not in SIGNALS:
+        raise ValueError(f"unknown strategy {strategy}, use one of {', '.join(SIGNALS)}")
+    signals = SIGNALS[strategy](ts, prices, tf_seconds, **params)
+    result = score(ts, prices, signals, exp_seconds, payout, decision_points(ts, every))
+    result.update(strategy=strategy, ticks=len(ts), params=params)
+    return result
+
+
+def format_result(result):
+    rate = result["win_rate"]
+    return (f"{result['trades']} trades ({result['buys']} buy / {result['sells']} sell), "
+            f"{result['wins']} won, {result['losses']} lost, {result['draws']} draws, "
+            f"{result['unresolved']} unresolved; win rate "
+            f"{'-' if rate != rate else f'{rate:.1%}'} (breakeven {result['breakeven']:.1%}), "
+            f"pnl {result['pnl']:+.2f} stakes, {result['return_per_trade']:+.4f} per trade")
+
+
+# ========== PARAMETER SWEEP ==========
+class ReplayCache:
+    """
+    Series a sweep reuses across parameter combinations, computed on first
+    use: moving averages per length, window counts per timeframe, settlement
+    moves per expiration and decision points per step. A combination then
+    only costs the comparisons in sma_signals and the gathers in score.
+    """
+    def __init__(self, ts, prices):
+        self.ts = ts
+        self.prices = prices
+        self.means = {}
+        self.counts = {}
+        self.moves = {}
+        self.points = {}
+
+    def mean(self, n):
+        if n not in self.means:
+            self.means[n] = indicators.sma(self.prices, n)
+        return self.means[n]
+
+    def count(self, tf_seconds):
+        if tf_seconds not in self.counts:
+            self.counts[tf_seconds] = window_counts(self.ts, tf_seconds)
+        return self.counts[tf_seconds]
+
+    def move(self, exp_seconds):
+        if exp_seconds not in self.moves:
+            self.moves[exp_seconds] = settlement_moves(self.ts, self.prices, exp_seconds)
+        return self.moves[exp_seconds]
+
+    def decision_points(self, every):
+        if every not in self.points:
+            self.points[every] = decision_points(self.ts, every)
+        return self.points[every]
+
+    def evaluate(self, fast_len, slow_len, tf_seconds, exp_seconds, payout=DEFAULT_PAYOUT, every=0, since=0):
+        """Backtest one combination, trading only at tick indices >= since (earlier ticks are warm-up)."""
+        signals = sma_signals(self.ts, self.prices, tf_seconds, fast_len, slow_len,
+                              self.mean(fast_len), self.mean(slow_len), self.count(tf_seconds))
+        points = self.decision_points(every)
+        if since:
+            points = points[np.searchsorted(points, since):]
+        result = score(self.ts, self.prices, signals, exp_seconds, payout, points, self.move(exp_seconds))
+        result.update(fast_len=fast_len, slow_len=slow_len, timeframe=tf_seconds, expiration=exp_seconds)
+        return result
+
+
+# pool worker state: the shared segment, the replayed columns and a ReplayCache over them
+_shm = None
+_ts = _prices = _cache = None
+
+
+def _use(ts, prices):
+    global _ts, _prices, _cache
+    _ts, _prices = ts, prices
+    _cache = ReplayCache(ts, prices) if ts is not None else None
+
+
+def _attach(name, size):
+    global _shm
+    _shm = shared_memory.SharedMemory(name=name)
+    data = np.ndarray((2, size), dtype=np.float64, buffer=_shm.buf)
+    data.flags.writeable = False
+    _use(data[0], data[1])
+
+
+def _map(func, tasks, ts, prices, workers=None):
+    """
+    Return [func(*task) for task in tasks], run across `workers` spawned
+    processes (default: one per CPU; 0 or 1 runs in this process). The ticks
+    are placed once in a shared memory segment the workers map read-only.
+    """
+    ts = np.ascontiguousarray(indicators.as_array(ts))
+    prices = np.ascontiguousarray(indicators.as_array(prices))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(tasks))
+    if workers <= 1:
+        _use(ts, prices)
+        try:
+            return [func(*task) for task in tasks]
+        finally:
+            _use(None, None)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, 16 * len(ts)))
+    try:
+        data = np.ndarray((2, len(ts)), dtype=np.float64, buffer=shm.buf)
+        data[0] = ts
+        data[1] = prices
+        del data
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(workers, initializer=_attach, initargs=(shm.name, len(ts))) as pool:
+            return pool.starmap(func, tasks)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _sweep_task(fast_len, slow_lens, timeframes, expirations, payout, every):
+    return [_cache.evaluate(fast_len, slow_len, tf, exp, payout, every)
+            for slow_len in slow_lens for tf in timeframes for exp in expirations]
+
+
+def sweep(ts, prices, fast_lens=SWEEP_FAST, slow_lens=SWEEP_SLOW, timeframes=(60,),
+          expirations=SWEEP_EXPIRATIONS, payout=DEFAULT_PAYOUT, every=0, workers=None):
+    """
+    Backtest the sma crossover for every fast x slow (fast < slow) x timeframe
+    x expiration combination. Work is split by fast length across `workers`
+    processes (see _map), and each worker's ReplayCache computes every moving
+    average once. Returns result dicts (see score) ranked by rank_sweep().
+    """
+    tasks = [(f, [s for s in slow_lens if s > f], list(timeframes), list(expirations), payout, every)
+             for f in sorted(set(fast_lens))]
+    tasks = [t for t in tasks if t[1]]
+    return rank_sweep([row for part in _map(_sweep_task, tasks, ts, prices, workers) for row in part])
+
+
+def rank_sweep(rows, min_trades=SWEEP_MIN_TRADES):
+    """Best payout-adjusted return per trade first; combinations with fewer than min_trades go last."""
+    return sorted(rows, key=lambda r: (r["trades"] < min_trades, -r["return_per_trade"]))
+
+
+def format_sweep(rows, top=10):
+    lines = [f"{'fast':>5} {'slow':>5} {'tf':>6} {'exp':>6} {'trades':>8} {'win rate':>9} {'pnl':>10} {'per trade':>10}"]
+    for r in rows[:top]:
+        rate = r["win_rate"]
+        lines.append(f"{r['fast_len']:>5} {r['slow_len']:>5} {r['timeframe']:>5}s {r['expiration']:>5}s "
+                     f"{r['trades']:>8} {'-' if rate != rate else f'{rate:.1%}':>9} "
+                     f"{r['pnl']:>+10.2f} {r['return_per_trade']:>+10.4f}")
+    return "\n".join(lines)
+
+
+# ========== WALK-FORWARD ==========
+def _combo(row):
+    return row["fast_len"], row["slow_len"], row["timeframe"], row["expiration"]
+
+
+def _fold_task(lo, mid, hi, fast_lens, slow_lens, timeframes, expirations, payout, every, min_trades):
+    # optimize on ticks [lo, mid), then trade the chosen combination on [mid, hi) with [lo, mid) as warm-up
+    train = ReplayCache(_ts[lo:mid], _prices[lo:mid])
+    rows = rank_sweep([train.evaluate(f, s, tf, exp, payout, every)
+                       for f in fast_lens for s in slow_lens if s > f
+                       for tf in timeframes for exp in expirations], min_trades)
+    fold = {"train": (float(_ts[lo]), float(_ts[mid - 1])), "test": (float(_ts[mid]), float(_ts[hi - 1])),
+            "ranking": [(_combo(r), r["return_per_trade"]) for r in rows if r["trades"] >= min_trades],
+            "chosen": None, "in_sample": None, "out_of_sample": None}
+    if fold["ranking"]:
+        best = rows[0]
+        test = ReplayCache(_ts[lo:hi], _prices[lo:hi])
+        fold.update(chosen=_combo(best), in_sample=best,
+                    out_of_sample=test.evaluate(*_combo(best), payout=payout, every=every, since=mid - lo))
+    return fold
+
+
+def walk_forward(ts, prices, train_seconds, test_seconds, fast_lens=SWEEP_FAST, slow_lens=SWEEP_SLOW,
+                 timeframes=(60,), expirations=SWEEP_EXPIRATIONS, payout=DEFAULT_PAYOUT, every=0,
+                 min_trades=SWEEP_MIN_TRADES, workers=None):
+    """
+    Rolling walk-forward optimization: each fold sweeps the grid on
+    train_seconds of ticks, picks the best combination and trades it on the
+    following test_seconds; folds advance by test_seconds. Folds run in
+    parallel (see _map). Returns {"folds", "out_of_sample", "stable"}:
+    out_of_sample sums the test periods only, and stable lists combinations
+    by how many folds ranked them in their top STABLE_TOP_FRACTION.
+    """
+    ts = indicators.as_array(ts)
+    tasks = []
+    start = ts[0] if len(ts) else 0.0
+    while len(ts) and start + train_seconds + test_seconds <= ts[-1]:
+        lo, mid, hi = np.searchsorted(ts, [start, start + train_seconds, start + train_seconds + test_seconds])
+        if mid - lo >= 3 and hi > mid:
+            tasks.append((int(lo), int(mid), int(hi), sorted(set(fast_lens)), list(slow_lens), list(timeframes),
+                          list(expirations), payout, every, min_trades))
+        start += test_seconds
+    folds = _map(_fold_task, tasks, ts, prices, workers) if tasks else []
+
+    total = {"folds": len(folds), "trades": 0, "wins": 0, "losses": 0, "draws": 0, "pnl": 0.0}
+    for fold in folds:
+        oos = fold["out_of_sample"]
+        if oos is not None:
+            for key in ("trades", "wins", "losses", "draws", "pnl"):
+                total[key] += oos[key]
+    decided = total["wins"] + total["losses"]
+    total["win_rate"] = total["wins"] / decided if decided else float("nan")
+    total["return_per_trade"] = total["pnl"] / total["trades"] if total["trades"] else 0.0
+    total["breakeven"] = 1.0 / (1.0 + payout)
+
+    regions = {}
+    for fold in folds:
+        ranking = fold.pop("ranking")
+        top = max(1, int(len(ranking) * STABLE_TOP_FRACTION + 0.5))
+        for rank, (combo, ret) in enumerate(ranking):
+            entry = regions.setdefault(combo, {"combo": combo, "top_folds": 0, "chosen": 0, "returns": []})
+            entry["returns"].append(ret)
+            entry["top_folds"] += rank < top
+        if fold["chosen"] is not None:
+            regions[fold["chosen"]]["chosen"] += 1
+    stable = []
+    for entry in regions.values():
+        returns = entry.pop("returns")
+        entry["mean_return"] = float(np.mean(returns))
+        entry["folds"] = len(returns)
+        stable.append(entry)
+    stable.sort(key=lambda e: (-e["top_folds"], -e["mean_return"]))
+    return {"folds": folds, "out_of_sample": total, "stable": stable}
+
+
+def format_walk_forward(report, top=5):
+    total = report["out_of_sample"]
+    rate = total["win_rate"]
+    lines = [f"{total['folds']} folds, out of sample: {total['trades']} trades, win rate "
+             f"{'-' if rate != rate else f'{rate:.1%}'} (breakeven {total['breakeven']:.1%}), "
+             f"pnl {total['pnl']:+.2f} stakes, {total['return_per_trade']:+.4f} per trade"]
+    for i, fold in enumerate(report["folds"]):
+        oos = fold["out_of_sample"]
+        test_from = time.strftime("%Y-%m-%d %H:%M", time.gmtime(fold["test"][0]))
+        if oos is None:
+            lines.append(f"  fold {i} (test from {test_from}): no combination with enough trades")
+            continue
+        lines.append(f"  fold {i} (test from {test_from}): fast/slow/tf/exp {fold['chosen']}, "
+                     f"in sample {fold['in_sample']['return_per_trade']:+.4f}, "
+                     f"out of sample {oos['return_per_trade']:+.4f} per trade over {oos['trades']} trades")
+    lines.append(f"  most stable (fast, slow, tf, exp): folds in top {STABLE_TOP_FRACTION:.0%} / chosen / mean in-sample return")
+    for entry in report["stable"][:top]:
+        lines.append(f"    {entry['combo']}: {entry['top_folds']}/{entry['folds']} / {entry['chosen']} / "
+                     f"{entry['mean_return']:+.4f}")
+    return "\n".join(lines)
+
+
+def main():
+    import signal_bot  # for parse_duration and the live length heuristics
+
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("symbols", nargs="*", metavar="symbol",
+                    help="Deriv symbol with a journal file, e.g. frxEURUSD (--walk-forward: default every SYMBOL_MAP symbol)")
+    ap.add_argument("--journal", default=signal_bot.JOURNAL_DIR)
+    ap.add_argument("--strategy", default="sma", choices=list(SIGNALS))
+    ap.add_argument("--timeframe", default="1m", help="comma-separated list with --sweep")
+    ap.add_argument("--expiration", default=None, help="default 2m (--sweep: 1m,2m,5m); comma-separated list with --sweep")
+    ap.add_argument("--fast", help="sma fast length in ticks (default: as signal_bot at the journal's tick rate); comma-separated list with --sweep")
+    ap.add_argument("--slow", help="sma slow length in ticks (default: as signal_bot at the journal's tick rate); comma-separated list with --sweep")
+    ap.add_argument("--payout", type=float, default=DEFAULT_PAYOUT)
+    ap.add_argument("--every", type=float, default=0, help="seconds between decisions (0 = every tick)")
+    ap.add_argument("--sweep", action="store_true", help="rank every sma fast/slow/timeframe/expiration combination")
+    ap.add_argument("--workers", type=int, default=None, help="sweep processes (default: one per CPU)")
+    ap.add_argument("--top", type=int, default=10, help="sweep rows to print")
+    ap.add_argument("--walk-forward", action="store_true", help="rolling train/test optimization of the sweep grid")
+    ap.add_argument("--train", default="6h", help="walk-forward training period")
+    ap.add_argument("--test", default="1h", help="walk-forward test period (and step between folds)")
+    ap.add_argument("--report", help="also write the walk-forward report as JSON to this file")
+    args = ap.parse_args()
+    grid = {
+        "fast_lens": [int(v) for v in args.fast.split(",")] if args.fast else SWEEP_FAST,
+        "slow_lens": [int(v) for v in args.slow.split(",")] if args.slow else SWEEP_SLOW,
+        "timeframes": [signal_bot.parse_duration(v) for v in args.timeframe.split(",")],
+        "expirations": [signal_bot.parse_duration(v) for v in args.expiration.split(",")] if args.expiration
+        else SWEEP_EXPIRATIONS,
+    }
+
+    if args.walk_forward:
+        symbols = args.symbols or sorted(set(signal_bot.SYMBOL_MAP.values()))
+        reports = {}
+        for symbol in symbols:
+            try:
+                ts, prices = load_journal(symbol, args.journal)
+            except FileNotFoundError:
+                print(f"[warn] no journal for {symbol}, skipped")
+                continue
+            started = time.perf_counter()
+            report = walk_forward(ts, prices, signal_bot.parse_duration(args.train), signal_bot.parse_duration(args.test),
+                                  payout=args.payout, every=args.every, workers=args.workers, **grid)
+            print(f"{symbol}: {len(ts)} ticks in {time.perf_counter() - started:.1f}s")
+            print(format_walk_forward(report, args.top))
+            reports[symbol] = report
+        if args.report:
+            with open(args.report, "w") as f:
+                json.dump(reports, f, indent=1, default=float)
+        return
+    if len(args.symbols) != 1:
+        ap.error("give exactly one symbol (several only with --walk-forward)")
+    args.symbol = args.symbols[0]
+
+    if args.sweep:
+        started = time.perf_counter()
+        ts, prices = load_journal(args.symbol, args.journal)
+        rows = sweep(ts, prices, payout=args.payout, every=args.every, workers=args.workers, **grid)
+        print(f"{args.symbol}: {len(rows)} combinations over {len(ts)} ticks in {time.perf_counter() - started:.2f}s")
+        print(format_sweep(rows, args.top))
+        return
+
+    tf_seconds = signal_bot.parse_duration(args.timeframe)
+    started = time.perf_counter()
+    ts, prices = load_journal(args.symbol, args.journal)
+    params = {}
+    if args.strategy == "sma":
+        # size the default lengths from the journal's average tick rate, as the bot does from its live rate
+        rate = (len(ts) - 1) / (ts[-1] - ts[0]) if len(ts) > 1 and ts[-1] > ts[0] else 1.0
+        fast_len, slow_len = signal_bot.sma_lengths(tf_seconds, rate)
+        params = {"fast_len": int(args.fast or fast_len), "slow_len": int(args.slow or slow_len)}
+    expiration = args.expiration or "2m"
+    result = run_backtest(ts, prices, args.strategy, tf_seconds, signal_bot.parse_duration(expiration),
+                          args.payout, args.every, **params)
+    elapsed = time.perf_counter() - started
+    print(f"{args.symbol} {args.strategy} {params} tf {args.timeframe} exp {expiration}: "
+          f"{len(ts)} ticks in {elapsed:.2f}s")
+    print(" ", format_result(result))
+
+
+if __name__ == "__main__":
+    main()
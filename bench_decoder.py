@@ -0,0 +1,86 @@
+"""
+bench_decoder.py
+Frames/second of the listener decode path: the original json.loads + chained
+dict lookups versus FrameDecoder with each available JSON backend.
+- Run: python bench_decoder.py [frames]
+- The frame mix is 95% tick frames in the Deriv wire format (as produced by
+  mock_deriv_server.py) and 5% other responses.
+"""
+
+import json
+import random
+import sys
+import time
+
+import signal_bot
+
+
+def make_frames(n, symbols=300):
+    rng = random.Random(7)
+    frames = []
+    for i in range(n):
+        sym = f"MOCK_{rng.randrange(symbols):03d}"
+        if rng.random() < 0.95:
+            quote = round(rng.uniform(0.5, 2.0), 5)
+            payload = {"echo_req": {"subscribe": 1, "ticks": sym}, "msg_type": "tick",
+                       "subscription": {"id": f"{i:016x}"},
+                       "tick": {"ask": quote, "bid": quote, "epoch": 1700000000 + i, "id": f"{i:016x}",
+                                "pip_size": 5, "quote": quote, "symbol": sym}}
+        else:
+            payload = {"echo_req": {"forget": f"{i:016x}"}, "msg_type": "forget", "forget": 1}
+        frames.append(json.dumps(payload, separators=(",", ":")))
+    return frames
+
+
+def baseline(frames):
+    """The decode path deriv_ws_listener used originally."""
+    out = 0
+    for msg in frames:
+        try:
+            data = json.loads(msg)
+        except Exception:
+            continue
+        if 'tick' in data:
+            t = data['tick']
+            symbol = t.get('symbol') or t.get('quote') or data.get('echo_req', {}).get('subscribe')
+            price = t.get('quote') or t.get('price') or t.get('bid') or t.get('ask')
+            if symbol and price is not None:
+                out += 1
+    return out
+
+
+def decoder_path(decoder):
+    def run(frames):
+        decode = decoder.decode
+        Tick = signal_bot.Tick
+        out = 0
+        for msg in frames:
+            frame = decode(msg)
+            if frame.__class__ is Tick:
+                out += 1
+        return out
+    return run
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    frames = make_frames(n)
+    cases = [("json.loads + lookups (original)", baseline),
+             ("FrameDecoder(json)", decoder_path(signal_bot.FrameDecoder("json")))]
+    if signal_bot.orjson is not None:
+        cases.append(("FrameDecoder(orjson)", decoder_path(signal_bot.FrameDecoder("orjson"))))
+    else:
+        print("orjson not installed; skipping the orjson backend")
+    print(f"{n} frames")
+    base = None
+    for name, fn in cases:
+        fn(frames[:1000])  # warm up
+        t0 = time.perf_counter()
+        ticks = fn(frames)
+        rate = n / (time.perf_counter() - t0)
+        base = base or rate
+        print(f"  {name:<32} {rate:12,.0f} frames/s  ({rate / base:.2f}x, {ticks} ticks)")
+
+
+if __name__ == "__main__":
+    main()
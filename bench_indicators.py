@@ -0,0 +1,49 @@
+"""
+bench_indicators.py
+Per-call cost of the indicators in indicators.py on a large tick window.
+- Run: python bench_indicators.py [points] [repeats]
+- Prices are a synthetic random walk stored in an array('d'), the same type
+  MarketData.get_prices_since returns, so the zero-copy wrap is measured too.
+"""
+
+import sys
+import timeit
+from array import array
+
+import numpy as np
+
+import indicators as ind
+
+
+def main():
+    points = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    rng = np.random.default_rng(1)
+    walk = 1.1 + np.cumsum(rng.normal(0.0, 1e-4, points))
+    prices = array('d', walk.tobytes())
+    high = walk + np.abs(rng.normal(0.0, 5e-5, points))
+    low = walk - np.abs(rng.normal(0.0, 5e-5, points))
+
+    cases = [
+        ("as_array (wrap)", lambda: ind.as_array(prices)),
+        ("sma(20)", lambda: ind.sma(prices, 20)),
+        ("ema(20)", lambda: ind.ema(prices, 20)),
+        ("wma(20)", lambda: ind.wma(prices, 20)),
+        ("rsi(14)", lambda: ind.rsi(prices, 14)),
+        ("macd(12,26,9)", lambda: ind.macd(prices)),
+        ("bollinger(20,2)", lambda: ind.bollinger(prices)),
+        ("rsi_last(14)", lambda: ind.rsi_last(prices, 14)),
+        ("macd_last(12,26,9)", lambda: ind.macd_last(prices, count=2)),
+        ("bollinger_last(20,2)", lambda: ind.bollinger_last(prices)),
+        ("atr(14)", lambda: ind.atr(high, low, walk, 14)),
+        ("stochastic(14,3)", lambda: ind.stochastic(high, low, walk)),
+    ]
+    print(f"{points} points, best of {repeats} calls")
+    for name, fn in cases:
+        fn()  # warm up
+        best = min(timeit.repeat(fn, number=1, repeat=repeats))
+        print(f"  {name:<20} {best * 1e6:10.1f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+indicators.py
+Vectorized technical indicators on contiguous float64 price arrays.
+- Inputs may be numpy arrays, lists or the array('d') slices returned by
+  MarketData.get_prices_since (wrapped without copying).
+- Every function returns full-length series aligned with its input; positions
+  without enough history are NaN. Take [-1] for the latest value, or use the
+  *_last variants, which only compute over the tail that still affects it.
+- Bar-based indicators (atr, stochastic) take high/low/close columns, see bars_to_arrays().
+"""
+
+import math
+
+import numpy as np
+
+# EMA blocks are sized so the in-block scale factors stay within ~1e12
+_EMA_LOG_RANGE = math.log(1e12)
+
+# weight below which an EMA's starting value no longer matters (see ema_warmup)
+_EMA_TAIL_WEIGHT = 1e-12
+
+
+def as_array(prices):
+    """Return prices as a float64 ndarray, sharing memory with array('d') / buffer inputs."""
+    if isinstance(prices, np.ndarray):
+        return prices.astype(np.float64, copy=False)
+    try:
+        view = memoryview(prices)
+    except TypeError:
+        return np.asarray(prices, dtype=np.float64)
+    if view.format == 'd':
+        return np.frombuffer(view, dtype=np.float64)
+    return np.asarray(prices, dtype=np.float64)
+
+
+def _nan_head(out, n):
+    out[:min(n, len(out))] = np.nan
+    return out
+
+
+def sma(prices, n):
+    """Simple moving average over n points (cumulative-sum based, O(len))."""
+    x = as_array(prices)
+    out = np.full(len(x), np.nan)
+    if n <= 0 or len(x) < n:
+        return out
+    # subtract the first value so the running sum stays small and precise
+    c = np.cumsum(x - x[0])
+    total = c[n - 1:].copy()
+    total[1:] -= c[:-n]
+    out[n - 1:] = total / n + x[0]
+    return out
+
+
+def ema(prices, n=None, alpha=None):
+    """
+    Exponential moving average y[t] = alpha*x[t] + (1-alpha)*y[t-1], seeded with x[0].
+    alpha defaults to 2/(n+1). The recurrence is solved block-wise: inside a
+    block it is a scaled cumulative sum, and only the carry between blocks is
+    propagated in a (short) Python loop.
+    """
+    x = as_array(prices)
+    size = len(x)
+    out = np.empty(size)
+    if size == 0:
+        return out
+    if alpha is None:
+        alpha = 2.0 / (n + 1)
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        out[:] = x
+        return out
+    block = int(max(1, min(size, _EMA_LOG_RANGE / -math.log(decay))))
+    blocks = -(-size // block)
+    padded = np.zeros(blocks * block)
+    padded[:size] = x
+    padded = padded.reshape(blocks, block)
+    powers = decay ** np.arange(block)
+    # local[b, j] = alpha * sum_{i<=j} x[b, i] * decay**(j-i), i.e. the EMA of the block started from 0
+    padded *= alpha / powers
+    local = np.cumsum(padded, axis=1, out=padded)
+    local *= powers
+    carry = np.empty(blocks)
+    c = x[0]
+    step = decay ** block
+    ends = local[:, -1].tolist()
+    for b in range(blocks):
+        carry[b] = c
+        c = ends[b] + step * c
+    local += carry[:, None] * (powers * decay)
+    out[:] = local.ravel()[:size]
+    return out
+
+
+def ema_warmup(n=None, alpha=None):
+    """
+    Points after which an EMA's seed carries less than _EMA_TAIL_WEIGHT of
+    the result, i.e. the EMA over that many trailing points matches the one
+    over the full history.
+    """
+    if alpha is None:
+        alpha = 2.0 / (n + 1)
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        return 1
+    return int(math.ceil(math.log(_EMA_TAIL_WEIGHT) / math.log(decay))) + 1
+
+
+def wma(prices, n):
+    """Linearly weighted moving average (weights 1..n, newest heaviest)."""
+    x = as_array(prices)
+    out = np.full(len(x), np.nan)
+    if n <= 0 or len(x) < n:
+        return out
+    weights = np.arange(n, 0, -1, dtype=np.float64)  # convolve flips the kernel
+    out[n - 1:] = np.convolve(x, weights / weights.sum(), mode='valid')
+    return out
+
+
+def rsi(prices, n=14):
+    """Relative Strength Index with Wilder smoothing (alpha = 1/n)."""
+    x = as_array(prices)
+    out = np.full(len(x), np.nan)
+    if len(x) < 2:
+        return out
+    diff = np.diff(x)
+    gain = ema(np.maximum(diff, 0.0), alpha=1.0 / n)
+    loss = ema(np.maximum(-diff, 0.0), alpha=1.0 / n)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        value = 100.0 - 100.0 / (1.0 + gain / loss)
+    value[loss == 0.0] = 100.0
+    value[(loss == 0.0) & (gain == 0.0)] = 50.0
+    out[1:] = value
+    return _nan_head(out, n)
+
+
+def rsi_last(prices, n=14):
+    """Latest rsi(prices, n) value, computed over the last ema_warmup(alpha=1/n) + 1 points."""
+    x = as_array(prices)
+    return rsi(x[-(ema_warmup(alpha=1.0 / n) + 1):], n)[-1]
+
+
+def macd(prices, fast=12, slow=26, signal=9):
+    """Returns (macd_line, signal_line, histogram)."""
+    x = as_array(prices)
+    line = ema(x, fast) - ema(x, slow)
+    sig = ema(line, signal)
+    return line, sig, line - sig
+
+
+def macd_last(prices, fast=12, slow=26, signal=9, count=1):
+    """Last `count` points of macd(prices, ...), computed over the tail both EMA stages need."""
+    x = as_array(prices)
+    tail = ema_warmup(max(fast, slow)) + ema_warmup(signal) + count - 1
+    line, sig, hist = macd(x[-tail:], fast, slow, signal)
+    return line[-count:], sig[-count:], hist[-count:]
+
+
+def bollinger(prices, n=20, k=2.0):
+    """Returns (middle, upper, lower) bands using the population standard deviation."""
+    x = as_array(prices)
+    mid = sma(x, n)
+    if len(x) < n or n <= 0:
+        return mid, mid.copy(), mid.copy()
+    centered = x - x[0]
+    c1 = np.cumsum(centered)
+    c2 = np.cumsum(centered * centered)
+    s1 = c1[n - 1:].copy()
+    s2 = c2[n - 1:].copy()
+    s1[1:] -= c1[:-n]
+    s2[1:] -= c2[:-n]
+    var = np.full(len(x), np.nan)
+    var[n - 1:] = np.maximum(s2 / n - (s1 / n) ** 2, 0.0)
+    dev = k * np.sqrt(var)
+    return mid, mid + dev, mid - dev
+
+
+def bollinger_last(prices, n=20, k=2.0):
+    """Latest (middle, upper, lower) of bollinger(prices, n, k), from the last n points only."""
+    x = as_array(prices)
+    if n <= 0 or len(x) < n:
+        return math.nan, math.nan, math.nan
+    window = x[-n:]
+    mid = float(window.mean())
+    dev = k * float(window.std())
+    return mid, mid + dev, mid - dev
+
+
+def atr(high, low, close, n=14):
+    """Average True Range with Wilder smoothing over bar columns."""
+    h, l, c = as_array(high), as_array(low), as_array(close)
+    if len(c) == 0:
+        return np.empty(0)
+    tr = h - l
+    prev = c[:-1]
+    tr[1:] = np.maximum(tr[1:], np.maximum(np.abs(h[1:] - prev), np.abs(l[1:] - prev)))
+    return _nan_head(ema(tr, alpha=1.0 / n), n - 1)
+
+
+def stochastic(high, low, close, k=14, d=3):
+    """Returns (%K, %D) of the stochastic oscillator over bar columns."""
+    h, l, c = as_array(high), as_array(low), as_array(close)
+    pct_k = np.full(len(c), np.nan)
+    if len(c) < k:
+        return pct_k, pct_k.copy()
+    highest = _rolling(np.maximum, h, k)
+    lowest = _rolling(np.minimum, l, k)
+    span = highest - lowest
+    with np.errstate(divide='ignore', invalid='ignore'):
+        value = np.where(span > 0, 100.0 * (c[k - 1:] - lowest) / span, 50.0)
+    pct_k[k - 1:] = value
+    pct_d = np.full(len(c), np.nan)
+    pct_d[k - 1:] = sma(value, d)
+    return pct_k, pct_d
+
+
+def _rolling(op, x, k):
+    """Rolling max/min over k points as k shifted vector ops (faster than a window view for small k)."""
+    size = len(x) - k + 1
+    out = x[k - 1:].copy()
+    for i in range(k - 1):
+        op(out, x[i:i + size], out=out)
+    return out
+
+
+def bars_to_arrays(bars):
+    """Split a list of Bar tuples (MarketData.get_bars) into open, high, low, close arrays."""
+    if not bars:
+        empty = np.empty(0)
+        return empty, empty, empty, empty
+    cols = np.array([(b.open, b.high, b.low, b.close) for b in bars], dtype=np.float64)
+    return cols[:, 0], cols[:, 1], cols[:, 2], cols[:, 3]
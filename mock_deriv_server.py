@@ -0,0 +1,277 @@
+"""
+mock_deriv_server.py
+Local stand-in for the Deriv websocket API, for load and failure testing offline.
+- Run: python mock_deriv_server.py --symbols 300 --rate 5 --latency 20 --disconnect-every 120
+- Point the bot at it: DERIV_WS_URL=ws://127.0.0.1:8765 python signal_bot.py
+Speaks the subset of the protocol the bot uses:
+    authorize, ticks (+subscribe), forget, forget_all, ticks_history (ticks/candles), active_symbols
+Every symbol is a synthetic random walk ticking `rate` times per second. The
+server pre-generates `--history` seconds so ticks_history works immediately,
+and can add response latency and drop connections at random to exercise the
+bot's reconnect path. A stats line with frames/second is printed periodically.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import numpy as np
+import websockets
+
+# Symbols from signal_bot.SYMBOL_MAP are always served, plus --symbols synthetic ones
+BASE_SYMBOLS = ["frxEURUSD", "frxGBPUSD", "frxAUDUSD"]
+
+
+# ========== SYNTHETIC MARKET ==========
+class SyntheticMarket:
+    """
+    All symbols tick together every 1/rate seconds. History is a ring of
+    `history_points` steps: one shared timestamp column and a
+    (symbols x steps) price matrix, so a step is one vectorized update.
+    """
+    def __init__(self, symbols, rate, history_seconds, seed=0):
+        self.symbols = symbols
+        self.index = {s: i for i, s in enumerate(symbols)}
+        self.rate = rate
+        self.interval = 1.0 / rate
+        self.rng = np.random.default_rng(seed)
+        self.size = max(2, int(history_seconds * rate))
+        self.times = np.zeros(self.size)
+        self.prices = np.zeros((len(symbols), self.size))
+        self.count = 0  # total steps generated
+        self.last = self.rng.uniform(0.5, 2.0, len(symbols))
+        self.vol = self.rng.uniform(2e-5, 2e-4, len(symbols)) / np.sqrt(rate)
+        # backdate the history so the first ticks_history calls have data
+        now = time.time()
+        for i in range(self.size - 1, 0, -1):
+            self.step(now - i * self.interval)
+
+    def epoch(self, ts):
+        # Deriv epochs are whole seconds; keep fractions only when ticking faster than 1/s
+        return int(ts) if self.rate <= 1 else round(ts, 3)
+
+    def step(self, ts):
+        self.last = self.last * np.exp(self.vol * self.rng.standard_normal(len(self.last)))
+        slot = self.count % self.size
+        self.times[slot] = self.epoch(ts)
+        self.prices[:, slot] = self.last
+        self.count += 1
+        return self.times[slot]
+
+    def window(self, symbol, start, end, count):
+        """Return (times, prices) of symbol within [start, end], at most the last `count`."""
+        n = min(self.count, self.size)
+        order = (np.arange(self.count - n, self.count) % self.size)
+        times = self.times[order]
+        prices = self.prices[self.index[symbol], order]
+        lo = np.searchsorted(times, start, side='left')
+        hi = np.searchsorted(times, end, side='right')
+        lo = max(lo, hi - count)
+        return times[lo:hi], prices[lo:hi]
+
+    def candles(self, symbol, start, end, count, granularity):
+        times, prices = self.window(symbol, start, end, len(self.times))
+        if not len(times):
+            return []
+        buckets = (times // granularity) * granularity
+        edges = np.flatnonzero(np.diff(buckets)) + 1
+        starts = np.concatenate([[0], edges])
+        stops = np.concatenate([edges, [len(times)]])
+        out = [{"epoch": int(buckets[a]), "open": round(float(prices[a]), 5),
+                "high": round(float(prices[a:b].max()), 5), "low": round(float(prices[a:b].min()), 5),
+                "close": round(float(prices[b - 1]), 5)} for a, b in zip(starts, stops)]
+        return out[-count:]
+
+
+# ========== SERVER ==========
+class MockDerivServer:
+    def __init__(self, market, latency=0.0, jitter=0.0, disconnect_every=0.0):
+        self.market = market
+        self.latency = latency
+        self.jitter = jitter
+        self.disconnect_every = disconnect_every
+        self.clients = set()
+        self.frames = 0
+        self.connections = 0
+        self.disconnects = 0
+
+    async def ticker(self):
+        """Advance the market and push a tick frame to every subscriber."""
+        next_at = time.time()
+        while True:
+            next_at += self.market.interval
+            await asyncio.sleep(max(0.0, next_at - time.time()))
+            epoch = self.market.step(time.time())
+            last = self.market.last
+            for client in list(self.clients):
+                client.publish(epoch, last)
+
+    async def report(self, every):
+        prev, prev_t = 0, time.time()
+        while True:
+            await asyncio.sleep(every)
+            now = time.time()
+            subs = sum(len(c.subs) for c in self.clients)
+            print(f"[mock] {len(self.clients)} clients, {subs} subscriptions, "
+                  f"{(self.frames - prev) / (now - prev_t):.0f} frames/s, "
+                  f"{self.connections} connects, {self.disconnects} injected disconnects")
+            prev, prev_t = self.frames, now
+
+    async def handler(self, ws, path=None):
+        client = MockClient(self, ws)
+        self.clients.add(client)
+        self.connections += 1
+        writer = asyncio.create_task(client.writer())
+        killer = asyncio.create_task(client.killer()) if self.disconnect_every else None
+        try:
+            async for raw in ws:
+                try:
+                    req = json.loads(raw)
+                except ValueError:
+                    client.reply({}, error=("InputValidationFailed", "Malformed JSON"), msg_type="error")
+                    continue
+                client.handle(req)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.clients.discard(client)
+            writer.cancel()
+            if killer is not None:
+                killer.cancel()
+
+
+class MockClient:
+    """One connection: its subscriptions and a delayed outbound queue."""
+    def __init__(self, server, ws):
+        self.server = server
+        self.ws = ws
+        self.subs = {}  # symbol index -> (subscription id, echo_req, req_id)
+        self.queue = asyncio.Queue()
+
+    def send(self, payload):
+        delay = self.server.latency + random.uniform(0.0, self.server.jitter)
+        # compact separators, like the real API
+        self.queue.put_nowait((time.time() + delay, json.dumps(payload, separators=(",", ":"))))
+
+    async def writer(self):
+        while True:
+            due, frame = await self.queue.get()
+            wait = due - time.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                await self.ws.send(frame)
+            except websockets.ConnectionClosed:
+                return
+            self.server.frames += 1
+
+    async def killer(self):
+        await asyncio.sleep(random.expovariate(1.0 / self.server.disconnect_every))
+        self.server.disconnects += 1
+        # abort without a closing handshake, like a dropped network path
+        self.ws.transport.abort()
+
+    def reply(self, req, error=None, msg_type=None, **fields):
+        payload = {"echo_req": req, "msg_type": msg_type}
+        if "req_id" in req:
+            payload["req_id"] = req["req_id"]
+        if error is not None:
+            payload["error"] = {"code": error[0], "message": error[1]}
+        payload.update(fields)
+        self.send(payload)
+
+    def publish(self, epoch, last):
+        for idx, (sub_id, echo, req_id) in self.subs.items():
+            symbol = self.server.market.symbols[idx]
+            quote = round(float(last[idx]), 5)
+            payload = {"echo_req": echo, "msg_type": "tick", "subscription": {"id": sub_id},
+                       "tick": {"ask": quote, "bid": quote, "epoch": epoch, "id": sub_id,
+                                "pip_size": 5, "quote": quote, "symbol": symbol}}
+            if req_id is not None:
+                payload["req_id"] = req_id
+            self.send(payload)
+
+    def handle(self, req):
+        market = self.server.market
+        if "authorize" in req:
+            self.reply(req, msg_type="authorize", authorize={"loginid": "MOCK0001", "currency": "USD"})
+        elif "ticks_history" in req:
+            symbol = req["ticks_history"]
+            if symbol not in market.index:
+                self.reply(req, error=("InvalidSymbol", f"Symbol {symbol} is invalid."), msg_type="history")
+                return
+            end = time.time() if req.get("end", "latest") == "latest" else float(req["end"])
+            start = float(req.get("start", 0))
+            count = int(req.get("count", 5000))
+            if req.get("style") == "candles":
+                candles = market.candles(symbol, start, end, count, int(req.get("granularity", 60)))
+                self.reply(req, msg_type="candles", candles=candles)
+            else:
+                times, prices = market.window(symbol, start, end, count)
+                self.reply(req, msg_type="history", pip_size=5,
+                           history={"times": times.tolist(), "prices": np.round(prices, 5).tolist()})
+        elif "ticks" in req:
+            symbol = req["ticks"]
+            idx = market.index.get(symbol)
+            if idx is None:
+                self.reply(req, error=("InvalidSymbol", f"Symbol {symbol} is invalid."), msg_type="tick")
+                return
+            if idx in self.subs:
+                self.reply(req, error=("AlreadySubscribed", f"You are already subscribed to {symbol}."), msg_type="tick")
+                return
+            if req.get("subscribe"):
+                self.subs[idx] = (f"{random.getrandbits(64):016x}", req, req.get("req_id"))
+            else:
+                quote = round(float(market.last[idx]), 5)
+                self.reply(req, msg_type="tick", tick={"epoch": market.epoch(time.time()), "quote": quote, "symbol": symbol})
+        elif "forget_all" in req:
+            forgotten = [sub_id for sub_id, _, _ in self.subs.values()]
+            self.subs.clear()
+            self.reply(req, msg_type="forget_all", forget_all=forgotten)
+        elif "forget" in req:
+            found = [idx for idx, (sub_id, _, _) in self.subs.items() if sub_id == req["forget"]]
+            for idx in found:
+                del self.subs[idx]
+            self.reply(req, msg_type="forget", forget=1 if found else 0)
+        elif "active_symbols" in req:
+            self.reply(req, msg_type="active_symbols", active_symbols=[
+                {"symbol": s, "display_name": s, "market": "synthetic_index", "exchange_is_open": 1, "pip": 0.00001}
+                for s in market.symbols])
+        elif "ping" in req:
+            self.reply(req, msg_type="ping", ping="pong")
+        else:
+            self.reply(req, error=("UnrecognisedRequest", "Unrecognised request."), msg_type="error")
+
+
+async def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--symbols", type=int, default=100, help="number of synthetic MOCK_nnn symbols")
+    ap.add_argument("--rate", type=float, default=1.0, help="ticks per second per symbol")
+    ap.add_argument("--history", type=float, default=3600, help="seconds of history kept for ticks_history")
+    ap.add_argument("--latency", type=float, default=0.0, help="added response latency in ms")
+    ap.add_argument("--jitter", type=float, default=0.0, help="extra random latency in ms (0..jitter)")
+    ap.add_argument("--disconnect-every", type=float, default=0.0,
+                    help="mean seconds between injected disconnects per connection (0 = never)")
+    ap.add_argument("--report", type=float, default=10.0, help="seconds between stats lines")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    symbols = BASE_SYMBOLS + [f"MOCK_{i:03d}" for i in range(args.symbols)]
+    random.seed(args.seed)
+    market = SyntheticMarket(symbols, args.rate, args.history, seed=args.seed)
+    server = MockDerivServer(market, latency=args.latency / 1000.0, jitter=args.jitter / 1000.0,
+                             disconnect_every=args.disconnect_every)
+    async with websockets.serve(server.handler, args.host, args.port, max_size=None):
+        print(f"[mock] serving {len(symbols)} symbols at {args.rate}/s on ws://{args.host}:{args.port}")
+        await asyncio.gather(server.ticker(), server.report(args.report))
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -1,10 +1,11 @@
 """
 signal_bot.py
 Manual signal generator using Deriv WebSocket market data.
-- Install dependencies: pip install websockets asyncio requests
+- Install dependencies: pip install -r requirements.txt (optional: pip install orjson for faster decoding)
 - Run: python signal_bot.py
 - Type commands at the prompt, e.g.:
-    signal EURUSD_OTC timeframe=1m expiration=2m
+    signal EURUSD_OTC timeframe=1m expiration=2m strategy=rsi
+    backtest EURUSD_OTC timeframe=1m expiration=2m
     list
     quit
 Notes:
@@ -12,15 +13,36 @@ Notes:
 - Adjust strategy in compute_signal() as needed.
 """
 
+import argparse
 import asyncio
+import bisect
 import json
+import math
+import mmap
+import multiprocessing
+import os
+import random
+import sys
+import threading
 import time
-import statistics
+import zlib
 import websockets
-from collections import deque
+import numpy as np
+from array import array
+from collections import OrderedDict, deque, namedtuple
+from multiprocessing import resource_tracker, shared_memory
+
+import backtest
+import indicators
+
+try:
+    import orjson  # optional, faster frame decoding (pip install orjson)
+except ImportError:
+    orjson = None
 
 # ========== CONFIG ==========
-DERIV_WS_URL = "wss://ws.deriv.com/websockets/v3?app_id=1089"  # replace app_id if you have one
+# replace app_id if you have one; set DERIV_WS_URL=ws://127.0.0.1:8765 to run against mock_deriv_server.py
+DERIV_WS_URL = os.environ.get("DERIV_WS_URL", "wss://ws.deriv.com/websockets/v3?app_id=1089")
 DERIV_TOKEN = None  # If you want account-level access, set your token here (not needed for public market data)
 # Map user-friendly instrument names to Deriv symbols. Verify exact names with Deriv's active_symbols.
 SYMBOL_MAP = {
@@ -30,8 +52,81 @@ SYMBOL_MAP = {
     # add more pairs (OTC) here
 }
 
-# Max number of price points stored per timeframe
-MAX_POINTS = 500
+# How long ticks are kept in memory per symbol. SYMBOL_RETENTION overrides per Deriv symbol.
+RETENTION = "6h"
+SYMBOL_RETENTION = {
+    # "frxEURUSD": "12h",
+}
+# Optional hard memory cap per symbol in bytes (None = only time-based eviction).
+# Each stored tick costs 16 bytes (float64 timestamp + float64 price).
+MAX_BYTES_PER_SYMBOL = 64 * 1024 * 1024
+SYMBOL_MAX_BYTES = {
+    # "R_100": 16 * 1024 * 1024,
+}
+# Initial number of tick slots allocated per symbol; buffers grow by doubling
+INITIAL_TICK_SLOTS = 4096
+
+# OHLC bars maintained incrementally on every tick, and how many finished bars to keep per timeframe
+BAR_TIMEFRAMES = ["5s", "15s", "1m", "5m", "15m", "1h"]
+BAR_HISTORY = 500
+
+# Backfill: timeout for request/response calls on the feed, max ticks per ticks_history call,
+# and the candle granularities (seconds) Deriv serves, used to backfill bar history
+REQUEST_TIMEOUT = 10
+HISTORY_MAX_TICKS = 5000
+# Most ticks_history pages (of HISTORY_MAX_TICKS each) fetched to fill one reconnect gap
+GAP_MAX_PAGES = 20
+CANDLE_GRANULARITIES = {60, 120, 180, 300, 600, 900, 1800, 3600, 7200, 14400, 28800, 86400}
+
+# JSON backend for incoming frames: "auto" (orjson if installed), "orjson" or "json"
+JSON_BACKEND = "auto"
+
+# Tick ingestion between the socket reader and MarketData: queue bound, ticks applied per batch,
+# and whether to keep only the newest tick per symbol (instead of dropping ticks) when the queue is full
+INGEST_QUEUE_SIZE = 10_000
+INGEST_BATCH = 500
+INGEST_CONFLATE = True
+
+# Number of websocket connections subscriptions are sharded across, and the most
+# ticks subscriptions put on one connection
+FEED_CONNECTIONS = 1
+FEED_MAX_SUBSCRIPTIONS = 100
+
+# Publish tick rings in multiprocessing shared memory under this name prefix so other local
+# processes can read them with SharedTickReader (None = private memory); --shared-memory overrides.
+# Shared rings have a fixed size of SHARED_TICK_SLOTS ticks (16 bytes each) per symbol.
+SHARED_MEMORY_PREFIX = None
+SHARED_TICK_SLOTS = 1 << 18
+
+# Time constant (seconds) of the exponentially weighted tick arrival rate tracked per symbol;
+# window lengths and backfill thresholds are sized from it instead of assuming 1 tick/second
+TICK_RATE_WINDOW = 120
+
+# Signal results kept for unchanged tick windows (LRU entries)
+SIGNAL_CACHE_SIZE = 1024
+
+# Outcome tracking of emitted BUY/SELL signals: outcomes kept per symbol/timeframe for the
+# rolling accuracy shown by `stats`, and how long after expiry to wait for the settling tick
+OUTCOME_WINDOW = 100
+OUTCOME_GRACE = 1.0
+
+# Worker processes symbols are sharded across (0 = everything in one process); --workers overrides
+WORKERS = 0
+
+# Error codes of a ticks subscribe reply after which the symbol is dropped for good; after any
+# other error (rate limit, closed market, ...) the subscribe is retried every SUBSCRIBE_RETRY_SECONDS
+PERMANENT_SUBSCRIBE_ERRORS = {"InvalidSymbol", "InputValidationFailed"}
+SUBSCRIBE_RETRY_SECONDS = 30
+
+# Reconnect backoff bounds (seconds) and the minimum tick gap worth backfilling after a reconnect
+RECONNECT_MIN_DELAY = 1
+RECONNECT_MAX_DELAY = 60
+GAP_MIN_SECONDS = 2
+
+# Append-only binary tick journal used for warm starts (None disables persistence)
+JOURNAL_DIR = "journal"
+JOURNAL_FLUSH_SECONDS = 1.0   # flush buffered ticks at least this often
+JOURNAL_BATCH = 512           # ...or as soon as a symbol has this many buffered
 
 # ========== UTILITIES ==========
 def parse_duration(s):
@@ -45,43 +140,829 @@ def parse_duration(s):
     raise ValueError("Invalid duration format, use e.g. 1m, 30s, 1h")
 
 # ========== Market Data Manager ==========
+class TickRing:
+    """
+    Columnar tick buffer: timestamps and prices live in two contiguous float64
+    arrays. New ticks are written at `end`; `head` marks the oldest live tick,
+    so the live region is always one contiguous slice.
+
+    Eviction is amortized: nothing is removed on append. When the write index
+    reaches the end of the arrays, every tick older than `retention` seconds
+    (relative to the newest tick) is dropped in one step, the live region is
+    moved back to the front, and the arrays are doubled if still more than
+    half full. If doubling would exceed `max_bytes`, the oldest ticks are
+    dropped instead so the buffer never outgrows its cap.
+    """
+    def __init__(self, retention, max_bytes=None, slots=INITIAL_TICK_SLOTS):
+        self.retention = retention
+        self.max_bytes = max_bytes
+        if max_bytes is not None:
+            slots = max(2, min(slots, max_bytes // 16))
+        self.ts = array('d', bytes(8 * slots))
+        self.prices = array('d', bytes(8 * slots))
+        self.head = 0
+        self.end = 0
+
+    def __len__(self):
+        return self.end - self.head
+
+    @property
+    def nbytes(self):
+        return 16 * len(self.ts)
+
+    def append(self, ts, price):
+        if self.end == len(self.ts):
+            self._make_room()
+        self.ts[self.end] = ts
+        self.prices[self.end] = price
+        self.end += 1
+
+    def extend(self, ts, prices):
+        """Bulk-append sorted ticks (array('d') columns) newer than the last stored one. Returns the count kept."""
+        start = bisect.bisect_left(ts, ts[-1] - self.retention) if len(ts) else 0
+        if self.max_bytes is not None:
+            start = max(start, len(ts) - self.max_bytes // 32)
+        n = len(ts) - start
+        if n <= 0:
+            return 0
+        if self.end + n > len(self.ts):
+            self._make_room(n)
+        self.ts[self.end:self.end + n] = ts[start:]
+        self.prices[self.end:self.end + n] = prices[start:]
+        self.end += n
+        return n
+
+    def clear(self):
+        self.head = self.end = 0
+
+    def _make_room(self, extra=1):
+        # bulk-evict everything past the retention horizon
+        if self.end > self.head:
+            cutoff = self.ts[self.end - 1] - self.retention
+            self.head = bisect.bisect_left(self.ts, cutoff, self.head, self.end)
+        slots = len(self.ts)
+        n = self.end - self.head
+        need = n + extra
+        if 2 * need > slots:
+            grown = slots
+            while 2 * need > grown and (self.max_bytes is None or 32 * grown <= self.max_bytes):
+                grown *= 2
+            if 2 * need > grown:
+                # at the memory cap: drop the oldest ticks down to half the buffer
+                self.head = self.end - max(0, min(n, grown // 2, grown - extra))
+            if grown > slots:
+                self._resize(grown)
+                return
+        elif 8 * need < slots and slots > INITIAL_TICK_SLOTS:
+            # mostly idle symbol: give memory back
+            self._resize(max(INITIAL_TICK_SLOTS, slots // 2))
+            return
+        self._compact()
+
+    def _compact(self):
+        n = self.end - self.head
+        self.ts[0:n] = self.ts[self.head:self.end]
+        self.prices[0:n] = self.prices[self.head:self.end]
+        self.head, self.end = 0, n
+
+    def _resize(self, slots):
+        n = self.end - self.head
+        ts = array('d', bytes(8 * slots))
+        prices = array('d', bytes(8 * slots))
+        ts[0:n] = self.ts[self.head:self.end]
+        prices[0:n] = self.prices[self.head:self.end]
+        self.ts, self.prices = ts, prices
+        self.head, self.end = 0, n
+
+    def index_since(self, cutoff):
+        """Return the absolute index of the first tick with timestamp >= cutoff (O(log n))."""
+        return bisect.bisect_left(self.ts, cutoff, self.head, self.end)
+
+    def timestamps(self, start=None):
+        return self.ts[self.head if start is None else start:self.end]
+
+    def values(self, start=None):
+        return self.prices[self.head if start is None else start:self.end]
+
+
+class RunningMean:
+    """
+    Mean of the last `window` ticks of one symbol (fewer while warming up),
+    kept as a running sum: each new tick adds its price and subtracts the one
+    leaving the window. The sum is recomputed exactly with math.fsum after
+    RESYNC_EVERY updates to stop float drift, and whenever the ring changed
+    underneath it (eviction, bulk load).
+    """
+    __slots__ = ("window", "total", "count", "updates")
+    RESYNC_EVERY = 10_000
+
+    def __init__(self, window, ring):
+        self.window = window
+        self.resync(ring)
+
+    def resync(self, ring):
+        self.count = min(self.window, len(ring))
+        self.total = math.fsum(ring.prices[ring.end - self.count:ring.end])
+        self.updates = 0
+
+    def update(self, ring, price):
+        """Called after `price` was appended to ring."""
+        n = len(ring)
+        self.updates += 1
+        if self.count != min(self.window, n - 1) or self.updates >= self.RESYNC_EVERY:
+            self.resync(ring)
+        elif n > self.window:
+            self.total += price - ring.prices[ring.end - 1 - self.window]
+        else:
+            self.total += price
+            self.count += 1
+
+    @property
+    def value(self):
+        return self.total / self.count if self.count else None
+
+
+Bar = namedtuple("Bar", "start open high low close ticks")
+
+
+class BarSeries:
+    """
+    OHLC + tick-count bars for one symbol and timeframe, built incrementally.
+    Bars are aligned to wall-clock boundaries (a 5m bar starts at :00, :05, ...).
+    A bar is finished when the first tick of a later bar arrives.
+    """
+    __slots__ = ("seconds", "bars", "start", "open", "high", "low", "close", "count")
+
+    def __init__(self, seconds, history=BAR_HISTORY):
+        self.seconds = seconds
+        self.bars = deque(maxlen=history)  # finished bars, oldest first
+        self.start = None
+        self.open = self.high = self.low = self.close = 0.0
+        self.count = 0
+
+    def update(self, ts, price):
+        """Fold a tick into the current bar. Returns True when it closed the previous bar."""
+        start = ts - ts % self.seconds
+        if start == self.start:
+            if price > self.high:
+                self.high = price
+            elif price < self.low:
+                self.low = price
+            self.close = price
+            self.count += 1
+            return False
+        closed = self.start is not None
+        if closed:
+            self.bars.append(Bar(self.start, self.open, self.high, self.low, self.close, self.count))
+        self.start = start
+        self.open = self.high = self.low = self.close = price
+        self.count = 1
+        return closed
+
+    def current(self):
+        """The bar still being built, or None before the first tick."""
+        if self.start is None:
+            return None
+        return Bar(self.start, self.open, self.high, self.low, self.close, self.count)
+
+
 class MarketData:
-    def __init__(self):
-        # store ticks per symbol: deque of (timestamp, price)
+    def __init__(self, journal=None):
+        # store ticks per symbol: TickRing of (timestamp, price) columns
         self.ticks = {}
+        # optional TickJournal every accepted live tick is written to
+        self.journal = journal
+        # per symbol: {window: RunningMean} for moving averages requested via sma()
+        self.means = {}
+        # per symbol: {timeframe seconds: BarSeries}
+        self.bars = {}
+        self.bar_timeframes = [parse_duration(tf) for tf in BAR_TIMEFRAMES]
+        # SharedIndex listing the symbols published in shared memory, see enable_shared()
+        self.shared = None
+        # per symbol: sequence number bumped whenever its stored ticks change
+        self.seq = {}
+        # callback(symbols) run by consume_ticks after each batch of live ticks (set by SignalWatcher)
+        self.on_batch = None
+        # per symbol: [exponentially weighted ticks/second, timestamp of the last tick,
+        # timestamp the estimate started from], see tick_rate()
+        self.rates = {}
+
+    def enable_shared(self, prefix, writer=0):
+        """Create tick rings for new symbols in shared memory segments named <prefix>_<symbol>."""
+        self.shared = SharedIndex(prefix, writer)
 
     def ensure_symbol(self, symbol):
         if symbol not in self.ticks:
-            self.ticks[symbol] = deque(maxlen=MAX_POINTS)
+            retention = parse_duration(SYMBOL_RETENTION.get(symbol, RETENTION))
+            if self.shared is not None:
+                self.ticks[symbol] = SharedTickRing(f"{self.shared.prefix}_{symbol}", retention)
+                self.shared.publish(list(self.ticks))
+            else:
+                max_bytes = SYMBOL_MAX_BYTES.get(symbol, MAX_BYTES_PER_SYMBOL)
+                self.ticks[symbol] = TickRing(retention, max_bytes)
+            self.bars[symbol] = {tf: BarSeries(tf) for tf in self.bar_timeframes}
+
+    def close(self):
+        """Release shared memory segments (no-op for private rings)."""
+        for ring in self.ticks.values():
+            if isinstance(ring, SharedTickRing):
+                ring.release()
+        if self.shared is not None:
+            self.shared.release()
 
     def add_tick(self, symbol, price, ts=None):
         self.ensure_symbol(symbol)
         if ts is None:
             ts = time.time()
-        self.ticks[symbol].append((ts, float(price)))
+        ts = float(ts)
+        ring = self.ticks[symbol]
+        # ticks must stay sorted for the bisect lookups; drop late/out-of-order ones
+        if len(ring) and ts < ring.ts[ring.end - 1]:
+            return
+        price = float(price)
+        ring.append(ts, price)
+        self.seq[symbol] = self.seq.get(symbol, 0) + 1
+        rate = self.rates.get(symbol)
+        if rate is None:
+            self.rates[symbol] = [1.0 / TICK_RATE_WINDOW, ts, ts]
+        else:
+            # decay by the gap since the previous tick, then count this one
+            rate[0] = rate[0] * math.exp((rate[1] - ts) / TICK_RATE_WINDOW) + 1.0 / TICK_RATE_WINDOW
+            rate[1] = ts
+        for series in self.bars[symbol].values():
+            series.update(ts, price)
+        means = self.means.get(symbol)
+        if means:
+            for mean in means.values():
+                mean.update(ring, price)
+        if self.journal is not None:
+            self.journal.append(symbol, ts, price)
+
+    def load_ticks(self, symbol, ts, prices):
+        """
+        Bulk-load sorted ticks (array('d') columns), e.g. from the journal.
+        Ticks not newer than the last stored one are skipped. Bars are rebuilt
+        only from the tail that can still be part of their history.
+        """
+        self.ensure_symbol(symbol)
+        ring = self.ticks[symbol]
+        if len(ring):
+            first = bisect.bisect_right(ts, ring.ts[ring.end - 1])
+            ts, prices = ts[first:], prices[first:]
+        if not len(ts):
+            return 0
+        added = ring.extend(ts, prices)
+        self.seq[symbol] = self.seq.get(symbol, 0) + 1
+        self._seed_rate(symbol)
+        for tf, series in self.bars[symbol].items():
+            start = max(len(ts) - added, bisect.bisect_left(ts, ts[-1] - tf * (BAR_HISTORY + 1)))
+            update = series.update
+            for i in range(start, len(ts)):
+                update(ts[i], prices[i])
+        for mean in self.means.get(symbol, {}).values():
+            mean.resync(ring)
+        return added
+
+    def _seed_rate(self, symbol):
+        # restart the rate estimate from the ticks stored in the last TICK_RATE_WINDOW seconds
+        ring = self.ticks[symbol]
+        last = ring.ts[ring.end - 1]
+        first = ring.index_since(last - TICK_RATE_WINDOW)
+        span = last - ring.ts[first]
+        if ring.end - first > 1 and span > 0:
+            # already a plain average, so no start-up correction (see tick_rate)
+            self.rates[symbol] = [(ring.end - first - 1) / span, last, -math.inf]
+
+    def tick_rate(self, symbol, now=None):
+        """
+        Exponentially weighted ticks per second of symbol, decayed to `now`
+        (a symbol that stopped ticking drifts towards 0). 1.0 until two ticks
+        have been seen.
+        """
+        rate = self.rates.get(symbol)
+        if rate is None or rate[1] <= rate[2]:
+            return 1.0
+        now = time.time() if now is None else now
+        # the average only covers ticks since rate[2]; undo the missing weight of earlier ones
+        observed = 1.0 - math.exp((rate[2] - rate[1]) / TICK_RATE_WINDOW)
+        return rate[0] / observed * math.exp(min(0.0, rate[1] - now) / TICK_RATE_WINDOW)
+
+    def merge_ticks(self, symbol, ts, prices):
+        """
+        Merge sorted historical ticks (e.g. a ticks_history response) into symbol,
+        skipping timestamps that are already stored. Returns the number of new ticks.
+        """
+        self.ensure_symbol(symbol)
+        ring = self.ticks[symbol]
+        ts = array('d', ts)
+        prices = array('d', prices)
+        if not len(ts):
+            return 0
+        if len(ring) and ts[0] <= ring.ts[ring.end - 1]:
+            # drop ticks already stored first, so an overlapping gap fill still takes the append path
+            old_ts = np.frombuffer(ring.timestamps(), dtype=np.float64)
+            new_ts = np.frombuffer(ts, dtype=np.float64)
+            keep = ~np.isin(new_ts, old_ts)
+            if not keep.any():
+                return 0
+            ts = array('d', new_ts[keep].tobytes())
+            prices = array('d', np.frombuffer(prices, dtype=np.float64)[keep].tobytes())
+        if not len(ring) or ts[0] > ring.ts[ring.end - 1]:
+            return self.load_ticks(symbol, ts, prices)
+        all_ts = np.concatenate([np.frombuffer(ring.timestamps(), dtype=np.float64), np.frombuffer(ts, dtype=np.float64)])
+        all_prices = np.concatenate([np.frombuffer(ring.values(), dtype=np.float64), np.frombuffer(prices, dtype=np.float64)])
+        order = np.argsort(all_ts, kind='stable')
+        all_ts = array('d', all_ts[order].tobytes())
+        all_prices = array('d', all_prices[order].tobytes())
+        # rebuild the ring from the merged series; history is rare enough that O(n) is fine here
+        ring.clear()
+        ring.extend(all_ts, all_prices)
+        self.seq[symbol] = self.seq.get(symbol, 0) + 1
+        self._seed_rate(symbol)
+        for mean in self.means.get(symbol, {}).values():
+            mean.resync(ring)
+        self._refold_bars(symbol, all_ts, all_prices, ts[0])
+        return len(ts)
+
+    def _refold_bars(self, symbol, ts, prices, since):
+        """
+        Rebuild bars from `since` on out of the sorted tick columns. Finished
+        bars before `since` are kept, and so are later ones the ticks do not
+        cover (e.g. candles added by merge_bars).
+        """
+        series_by_tf = self.bars[symbol]
+        for tf, series in list(series_by_tf.items()):
+            cut = since - since % tf
+            horizon = ts[-1] - tf * (BAR_HISTORY + 1)
+            cut = max(cut, horizon - horizon % tf)
+            fresh = BarSeries(tf, series.bars.maxlen)
+            update = fresh.update
+            for i in range(bisect.bisect_left(ts, cut), len(ts)):
+                update(ts[i], prices[i])
+            rebuilt = {b.start for b in fresh.bars}
+            open_start = fresh.start if fresh.start is not None else float('inf')
+            kept = [b for b in series.bars if b.start not in rebuilt and b.start < open_start]
+            merged = sorted(kept + list(fresh.bars), key=lambda b: b.start)
+            fresh.bars.clear()
+            fresh.bars.extend(merged)
+            series_by_tf[tf] = fresh
+
+    def merge_bars(self, symbol, timeframe, bars):
+        """Add finished Bar tuples (e.g. from Deriv candles) whose start is not already present."""
+        self.ensure_symbol(symbol)
+        series = self._bar_series(symbol, timeframe)
+        if series is None:
+            return 0
+        have = {b.start for b in series.bars}
+        open_start = series.start if series.start is not None else float('inf')
+        extra = [b for b in bars if b.start not in have and b.start < open_start]
+        if not extra:
+            return 0
+        merged = sorted(list(series.bars) + extra, key=lambda b: b.start)
+        series.bars.clear()
+        series.bars.extend(merged)
+        return len(extra)
+
+    def sma(self, symbol, window):
+        """
+        Mean of the last `window` ticks of symbol. The first call registers a
+        RunningMean that add_tick keeps current, so later calls are a lookup.
+        """
+        self.ensure_symbol(symbol)
+        means = self.means.setdefault(symbol, {})
+        mean = means.get(window)
+        if mean is None:
+            mean = means[window] = RunningMean(window, self.ticks[symbol])
+        return mean.value
+
+    def window_start(self, symbol, since_seconds):
+        """(seq, absolute index of the first tick in the last since_seconds) - together they identify a window's contents."""
+        self.ensure_symbol(symbol)
+        ring = self.ticks[symbol]
+        return self.seq.get(symbol, 0), ring.index_since(time.time() - since_seconds)
+
+    def count_since(self, symbol, since_seconds):
+        """Number of ticks in the last since_seconds, without copying them."""
+        self.ensure_symbol(symbol)
+        ring = self.ticks[symbol]
+        return ring.end - ring.index_since(time.time() - since_seconds)
 
     def get_prices_since(self, symbol, since_seconds):
-        """Return list of prices from last since_seconds seconds."""
+        """Return prices (float64 array) from last since_seconds seconds."""
         self.ensure_symbol(symbol)
+        ring = self.ticks[symbol]
         cutoff = time.time() - since_seconds
-        return [p for (t,p) in self.ticks[symbol] if t >= cutoff]
+        return ring.values(ring.index_since(cutoff))
+
+    def get_bars(self, symbol, timeframe, count=None):
+        """Return finished bars (oldest first) for a maintained timeframe like '1m' or 60."""
+        series = self._bar_series(symbol, timeframe)
+        if series is None:
+            return []
+        if count is None or count >= len(series.bars):
+            return list(series.bars)
+        return [series.bars[i] for i in range(len(series.bars) - count, len(series.bars))]
+
+    def last_bar(self, symbol, timeframe):
+        """Most recently finished bar, or None (O(1))."""
+        series = self._bar_series(symbol, timeframe)
+        if series is None or not series.bars:
+            return None
+        return series.bars[-1]
+
+    def current_bar(self, symbol, timeframe):
+        """The bar still in progress, or None."""
+        series = self._bar_series(symbol, timeframe)
+        return series.current() if series is not None else None
+
+    def _bar_series(self, symbol, timeframe):
+        if isinstance(timeframe, str):
+            timeframe = parse_duration(timeframe)
+        return self.bars.get(symbol, {}).get(timeframe)
+
+
+
+# ========== SHARED MEMORY ==========
+# Segment header: 8 int64 slots at the start of each segment
+SHM_HEADER = 64
+SHM_MAGIC = 0x5449434b52494e47  # "TICKRING"
+H_MAGIC, H_SEQ, H_HEAD, H_END, H_SLOTS, H_GEN, H_RETENTION, H_PID = range(8)
+
+
+def _pid_alive(pid):
+    if os.name == "nt":
+        return True  # Windows frees segments with their last handle, so an existing one is in use
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _create_segment(name, size):
+    """Create segment `name`, stamped with this process's pid; replaces it only if its writer is gone."""
+    try:
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+    except FileExistsError:
+        existing = _attach_segment(name)
+        header = existing.buf[:SHM_HEADER].cast('q') if existing.size >= SHM_HEADER else None
+        owner = header[H_PID] if header is not None and header[H_MAGIC] == SHM_MAGIC else 0
+        if header is not None:
+            header.release()
+        existing.close()
+        if owner > 0 and owner != os.getpid() and _pid_alive(owner):
+            raise RuntimeError(f"shared memory segment {name} belongs to running process {owner}; "
+                               "stop it or use another --shared-memory prefix")
+        # left behind by a process that did not shut down cleanly
+        stale = shared_memory.SharedMemory(name=name)
+        stale.close()
+        stale.unlink()
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+    header = shm.buf[:SHM_HEADER].cast('q')
+    header[H_PID] = os.getpid()
+    header.release()
+    return shm
+
+
+def _attach_segment(name):
+    """Attach to an existing segment without letting this process's resource tracker unlink it on exit."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+def _copy(view):
+    out = array('d')
+    out.frombytes(view.cast('B'))
+    return out
+
+
+class SharedTickRing(TickRing):
+    """
+    TickRing whose columns live in a shared memory segment:
+        [header: 8 x int64][timestamps: slots x float64][prices: slots x float64]
+    The header records the writer's pid, so a second bot started with the
+    same prefix refuses to take over live segments. The size is fixed, so at capacity the oldest ticks are dropped as with
+    MAX_BYTES_PER_SYMBOL. Writes follow a seqlock protocol: the header
+    sequence number is odd while a mutation is in progress and even once
+    head/end are published, and the generation counter is bumped before
+    stored ticks move or are evicted (appends never touch published ticks).
+    """
+    def __init__(self, name, retention, slots=SHARED_TICK_SLOTS):
+        self.retention = retention
+        self.max_bytes = 16 * slots  # never grows
+        self.shm = _create_segment(name, SHM_HEADER + 16 * slots)
+        buf = self.shm.buf
+        self.header = buf[:SHM_HEADER].cast('q')
+        self.ts = buf[SHM_HEADER:SHM_HEADER + 8 * slots].cast('d')
+        self.prices = buf[SHM_HEADER + 8 * slots:SHM_HEADER + 16 * slots].cast('d')
+        self.head = self.end = 0
+        h = self.header
+        h[H_SEQ] = h[H_HEAD] = h[H_END] = h[H_GEN] = 0
+        h[H_SLOTS] = slots
+        h[H_RETENTION] = int(retention)
+        h[H_MAGIC] = SHM_MAGIC
+
+    def _publish(self):
+        h = self.header
+        h[H_HEAD] = self.head
+        h[H_END] = self.end
+        h[H_SEQ] += 1
+
+    def append(self, ts, price):
+        self.header[H_SEQ] += 1
+        super().append(ts, price)
+        self._publish()
+
+    def extend(self, ts, prices):
+        self.header[H_SEQ] += 1
+        try:
+            return super().extend(ts, prices)
+        finally:
+            self._publish()
+
+    def clear(self):
+        self.header[H_SEQ] += 1
+        self.header[H_GEN] += 1
+        super().clear()
+        self._publish()
+
+    def _make_room(self, extra=1):
+        # invalidate outstanding views before any published tick is moved or overwritten
+        self.header[H_GEN] += 1
+        super()._make_room(extra)
+
+    def _resize(self, slots):
+        # the segment cannot change size; just move the live ticks to the front
+        self._compact()
+
+    # readers in this process get copies, so later compaction cannot change them
+    def timestamps(self, start=None):
+        return _copy(super().timestamps(start))
+
+    def values(self, start=None):
+        return _copy(super().values(start))
+
+    def release(self):
+        for view in (self.header, self.ts, self.prices):
+            view.release()
+        self.shm.close()
+        self.shm.unlink()
+
+
+class SharedIndex:
+    """Small segment <prefix>_index_<writer> listing the symbols a writer publishes (seqlocked JSON)."""
+    SIZE = 64 * 1024
+
+    def __init__(self, prefix, writer=0):
+        self.prefix = prefix
+        self.shm = _create_segment(f"{prefix}_index_{writer}", self.SIZE)
+        self.header = self.shm.buf[:SHM_HEADER].cast('q')
+        self.header[H_SEQ] = self.header[H_END] = 0
+        self.header[H_MAGIC] = SHM_MAGIC
+
+    def publish(self, symbols):
+        data = json.dumps(symbols).encode()
+        if SHM_HEADER + len(data) > self.SIZE:
+            raise ValueError("too many symbols for the shared memory index")
+        h = self.header
+        h[H_SEQ] += 1
+        self.shm.buf[SHM_HEADER:SHM_HEADER + len(data)] = data
+        h[H_END] = len(data)
+        h[H_SEQ] += 1
+
+    def release(self):
+        self.header.release()
+        self.shm.close()
+        self.shm.unlink()
+
+
+class SharedTickReader:
+    """
+    Read-only access, from any local process, to the ticks a bot publishes
+    with --shared-memory PREFIX:
+        reader = SharedTickReader("signalbot")
+        ts, prices = reader.window("frxEURUSD", 300)      # consistent copies
+        ts, prices, token = reader.view("frxEURUSD", 300) # zero-copy memoryviews
+        ...use them...; reader.valid("frxEURUSD", token)  # False if they were overwritten meanwhile
+    """
+    def __init__(self, prefix=SHARED_MEMORY_PREFIX, retries=1000):
+        self.prefix = prefix
+        self.retries = retries
+        self.rings = {}  # symbol -> (shm, header, ts, prices)
+
+    def symbols(self):
+        """Symbols published by every writer (single process or all --workers shards)."""
+        names = []
+        writer = 0
+        while True:
+            try:
+                shm = _attach_segment(f"{self.prefix}_index_{writer}")
+            except FileNotFoundError:
+                return names
+            header = shm.buf[:SHM_HEADER].cast('q')
+            try:
+                for _ in range(self.retries):
+                    seq = header[H_SEQ]
+                    if seq & 1:
+                        continue
+                    data = bytes(shm.buf[SHM_HEADER:SHM_HEADER + header[H_END]])
+                    if header[H_SEQ] == seq:
+                        names.extend(json.loads(data) if data else [])
+                        break
+            finally:
+                header.release()
+                shm.close()
+            writer += 1
+
+    def _ring(self, symbol):
+        ring = self.rings.get(symbol)
+        if ring is None:
+            shm = _attach_segment(f"{self.prefix}_{symbol}")
+            header = shm.buf[:SHM_HEADER].cast('q')
+            if header[H_MAGIC] != SHM_MAGIC:
+                raise ValueError(f"{self.prefix}_{symbol} is not a tick ring")
+            slots = header[H_SLOTS]
+            ts = shm.buf[SHM_HEADER:SHM_HEADER + 8 * slots].cast('d')
+            prices = shm.buf[SHM_HEADER + 8 * slots:SHM_HEADER + 16 * slots].cast('d')
+            ring = self.rings[symbol] = (shm, header, ts, prices)
+        return ring
+
+    def _locate(self, header, ts, since_seconds):
+        """Seqlock-consistent (start, end, generation, seq) of the window, or None if a write is in progress."""
+        seq = header[H_SEQ]
+        if seq & 1:
+            return None
+        head, end, gen = header[H_HEAD], header[H_END], header[H_GEN]
+        start = head
+        if since_seconds is not None and end > head:
+            start = bisect.bisect_left(ts, time.time() - since_seconds, head, end)
+        return start, end, gen, seq
+
+    def window(self, symbol, since_seconds=None):
+        """Copy out (timestamps, prices) of the last since_seconds (all retained ticks if None)."""
+        _, header, ts, prices = self._ring(symbol)
+        for attempt in range(self.retries):
+            loc = self._locate(header, ts, since_seconds)
+            if loc is not None:
+                start, end, _, seq = loc
+                out = (_copy(ts[start:end]), _copy(prices[start:end]))
+                if header[H_SEQ] == seq:
+                    return out
+            if attempt % 100 == 99:
+                time.sleep(0)
+        raise RuntimeError(f"no consistent read of {symbol} after {self.retries} attempts")
+
+    def view(self, symbol, since_seconds=None):
+        """
+        Zero-copy (timestamps, prices, token) memoryviews of the window. Ticks
+        already published are only rewritten when the writer compacts or
+        evicts, so the views stay correct until valid(symbol, token) is False.
+        """
+        _, header, ts, prices = self._ring(symbol)
+        for attempt in range(self.retries):
+            loc = self._locate(header, ts, since_seconds)
+            if loc is not None and header[H_SEQ] == loc[3]:
+                start, end, gen, _ = loc
+                return ts[start:end], prices[start:end], gen
+            if attempt % 100 == 99:
+                time.sleep(0)
+        raise RuntimeError(f"no consistent read of {symbol} after {self.retries} attempts")
+
+    def valid(self, symbol, token):
+        return self._ring(symbol)[1][H_GEN] == token
+
+    def close(self):
+        for shm, header, ts, prices in self.rings.values():
+            for view in (header, ts, prices):
+                view.release()
+            shm.close()
+        self.rings.clear()
+
+# ========== TICK JOURNAL ==========
+class TickJournal:
+    """
+    Append-only per-symbol tick files (<JOURNAL_DIR>/<symbol>.ticks) made of
+    fixed 16-byte records: little-endian float64 epoch + float64 price.
+    Live ticks are buffered and written in batches; on startup the files are
+    memory-mapped and bulk-loaded into MarketData.
+    """
+    RECORD = 16
+
+    def __init__(self, directory=JOURNAL_DIR, batch=JOURNAL_BATCH):
+        self.directory = directory
+        self.batch = batch
+        self.pending = {}  # symbol -> array('d') of interleaved ts, price
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, symbol):
+        return os.path.join(self.directory, symbol + ".ticks")
+
+    def append(self, symbol, ts, price):
+        buf = self.pending.get(symbol)
+        if buf is None:
+            buf = self.pending[symbol] = array('d')
+        buf.append(ts)
+        buf.append(price)
+        if len(buf) >= 2 * self.batch:
+            self.flush(symbol)
+
+    def flush(self, symbol=None):
+        symbols = [symbol] if symbol is not None else list(self.pending)
+        for sym in symbols:
+            buf = self.pending.pop(sym, None)
+            if buf:
+                if sys.byteorder != "little":
+                    buf.byteswap()
+                with open(self.path(sym), "ab") as f:
+                    f.write(buf.tobytes())
+
+    def load(self, market, owns=None):
+        """Load journal files into market (only symbols for which owns(symbol) is true, if given). Returns (symbols, ticks)."""
+        symbols = ticks = 0
+        for name in sorted(os.listdir(self.directory)):
+            if name.endswith(".ticks"):
+                symbol = name[:-len(".ticks")]
+                if owns is not None and not owns(symbol):
+                    continue
+                n = self._load_symbol(market, symbol)
+                if n:
+                    symbols += 1
+                    ticks += n
+        return symbols, ticks
+
+    def _load_symbol(self, market, symbol):
+        path = self.path(symbol)
+        size = os.path.getsize(path)
+        records = size // self.RECORD
+        if size != records * self.RECORD:
+            # drop a torn trailing record so later appends stay aligned to RECORD
+            os.truncate(path, records * self.RECORD)
+        if records == 0:
+            return 0
+        market.ensure_symbol(symbol)
+        retention = market.ticks[symbol].retention
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            raw = memoryview(mm)[:records * self.RECORD]
+            stamps = raw.cast('d')[0::2]
+            try:
+                # bisect directly on the mapped timestamps to skip expired records without reading them
+                first = bisect.bisect_left(stamps, stamps[records - 1] - retention)
+                data = array('d')
+                data.frombytes(raw[first * self.RECORD:])
+            finally:
+                stamps.release()
+                raw.release()
+        if sys.byteorder != "little":
+            data.byteswap()
+        loaded = market.load_ticks(symbol, data[0::2], data[1::2])
+        if first > records // 2:
+            # most of the file has expired: rewrite it with only the retained tail
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(data.tobytes() if sys.byteorder == "little" else self._swapped(data))
+            os.replace(tmp, path)
+        return loaded
+
+    @staticmethod
+    def _swapped(data):
+        out = array('d', data)
+        out.byteswap()
+        return out.tobytes()
+
+
+async def journal_flusher(journal):
+    """Periodically write buffered ticks so the journal lags live data by at most JOURNAL_FLUSH_SECONDS."""
+    while True:
+        await asyncio.sleep(JOURNAL_FLUSH_SECONDS)
+        journal.flush()
+
 
 market = MarketData()
 
 # ========== SIGNAL STRATEGY ==========
-def compute_signal(prices, fast_len=5, slow_len=20):
+def compute_signal(prices, fast_len=5, slow_len=20, fast_ma=None, slow_ma=None):
     """
     Simple moving average crossover:
     - if fast_ma > slow_ma and slope positive -> BUY
     - if fast_ma < slow_ma and slope negative -> SELL
     - otherwise HOLD
+    fast_ma/slow_ma may be passed in precomputed (e.g. from MarketData.sma);
+    they must equal the means of the last fast_len/slow_len prices.
     Returns: (signal:str, info:str)
     """
     if len(prices) < max(fast_len, slow_len) or len(prices) < 3:
         return ("HOLD", "not enough data")
     # use last contiguous prices
-    fast_ma = statistics.mean(prices[-fast_len:])
-    slow_ma = statistics.mean(prices[-slow_len:]) if len(prices) >= slow_len else statistics.mean(prices)
+    if fast_ma is None:
+        fast_ma = math.fsum(prices[-fast_len:]) / fast_len
+    if slow_ma is None:
+        slow_ma = math.fsum(prices[-slow_len:]) / slow_len
     # slope of last 3 prices as a very simple momentum check
     slope = (prices[-1] - prices[-3]) / 2.0
     if fast_ma > slow_ma and slope > 0:
@@ -90,107 +971,1440 @@ def compute_signal(prices, fast_len=5, slow_len=20):
         return ("SELL", f"fast_ma {fast_ma:.5f} < slow_ma {slow_ma:.5f}, slope {slope:.6f}")
     return ("HOLD", f"fast_ma {fast_ma:.5f}, slow_ma {slow_ma:.5f}, slope {slope:.6f}")
 
+def rsi_signal(prices, length=14, oversold=30, overbought=70):
+    """
+    RSI mean reversion:
+    - RSI below oversold -> BUY
+    - RSI above overbought -> SELL
+    """
+    if len(prices) <= length:
+        return ("HOLD", "not enough data")
+    value = indicators.rsi_last(prices, length)
+    if value < oversold:
+        return ("BUY", f"rsi {value:.1f} < {oversold}")
+    if value > overbought:
+        return ("SELL", f"rsi {value:.1f} > {overbought}")
+    return ("HOLD", f"rsi {value:.1f}")
+
+def macd_signal(prices, fast=12, slow=26, signal=9):
+    """
+    MACD momentum:
+    - histogram positive and rising -> BUY
+    - histogram negative and falling -> SELL
+    """
+    if len(prices) < slow + signal:
+        return ("HOLD", "not enough data")
+    line, sig, hist = indicators.macd_last(prices, fast, slow, signal, count=2)
+    info = f"macd {line[-1]:.6f}, signal {sig[-1]:.6f}, hist {hist[-1]:.6f}"
+    if hist[-1] > 0 and hist[-1] > hist[-2]:
+        return ("BUY", info)
+    if hist[-1] < 0 and hist[-1] < hist[-2]:
+        return ("SELL", info)
+    return ("HOLD", info)
+
+def bollinger_signal(prices, length=20, width=2.0):
+    """
+    Bollinger band reversion:
+    - last price below the lower band -> BUY
+    - last price above the upper band -> SELL
+    """
+    if len(prices) < length:
+        return ("HOLD", "not enough data")
+    mid, upper, lower = indicators.bollinger_last(prices, length, width)
+    last = prices[-1]
+    info = f"price {last:.5f}, bands {lower:.5f}..{upper:.5f}"
+    if last < lower:
+        return ("BUY", info)
+    if last > upper:
+        return ("SELL", info)
+    return ("HOLD", info)
+
+# strategy name (as typed after strategy=) -> function(prices, **params) returning (signal, info)
+STRATEGIES = {
+    "sma": compute_signal,
+    "rsi": rsi_signal,
+    "macd": macd_signal,
+    "bollinger": bollinger_signal,
+}
+
+# ========== FRAME DECODING ==========
+# A decoded tick: only the fields the bot uses
+Tick = namedtuple("Tick", "symbol epoch quote sub_id")
+
+
+# json.loads minus its argument checks and whitespace handling (see FrameDecoder._decode_full)
+_scan_json = json.JSONDecoder().scan_once
+
+class FrameDecoder:
+    """
+    Turns raw websocket frames into Tick tuples (the hot path) or parsed dicts
+    (everything else). Tick frames are recognised by their msg_type with a
+    substring check, and only their flat "tick" object is parsed; echo_req,
+    subscription etc. are skipped. Any frame the fast path cannot handle
+    (spaced JSON, no quote, ...) is parsed in full. The stdlib json backend
+    gains nothing from the partial parse, so it parses every frame in full
+    and only builds a Tick for msg_type "tick".
+    """
+    def __init__(self, backend=JSON_BACKEND):
+        if backend == "auto":
+            backend = "orjson" if orjson is not None else "json"
+        if backend == "orjson" and orjson is None:
+            raise ValueError("JSON_BACKEND is 'orjson' but orjson is not installed")
+        if backend not in ("orjson", "json"):
+            raise ValueError(f"unknown JSON backend {backend!r}")
+        self.backend = backend
+        self.loads = orjson.loads if backend == "orjson" else json.loads
+        if backend == "json":
+            self.decode = self._decode_full
+
+    def _decode_full(self, raw):
+        """
+        decode() for the stdlib backend: one full parse, no substring checks.
+        Compact frames go straight to the C scanner, skipping json.loads'
+        wrapper layers; anything else (bytes, whitespace, bad JSON) takes json.loads.
+        """
+        try:
+            data, end = _scan_json(raw, 0)
+            if end != len(raw):
+                raise ValueError
+        except (TypeError, ValueError, StopIteration):
+            try:
+                data = json.loads(raw)
+            except ValueError:
+                return None
+        if data.__class__ is not dict or data.get('msg_type') != 'tick':
+            return data
+        t = data.get('tick') or {}
+        quote = t.get('quote')
+        symbol = t.get('symbol')
+        if quote is not None and symbol:
+            return Tick(symbol, t.get('epoch') or time.time(), float(quote), t.get('id'))
+        return self.from_dict(data) or data
+
+    def decode(self, raw):
+        """Return a Tick, the parsed dict for any other frame, or None if the frame is not valid JSON."""
+        if isinstance(raw, bytes):
+            raw = raw.decode("utf-8", "replace")
+        # Deriv sends compact JSON; the check costs far less than parsing the frame
+        if '"msg_type":"tick"' in raw:
+            start = raw.find('"tick":{')
+            if start >= 0:
+                end = raw.find('}', start)
+                try:
+                    t = self.loads(raw[start + 7:end + 1])
+                except ValueError:
+                    t = None
+                if t is not None:
+                    quote = t.get('quote')
+                    symbol = t.get('symbol')
+                    if quote is not None and symbol:
+                        return Tick(symbol, t.get('epoch') or time.time(), float(quote), t.get('id'))
+        try:
+            return self.loads(raw)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def from_dict(data):
+        """Tick from an already parsed tick frame (slow path), or None."""
+        t = data.get('tick') or {}
+        symbol = t.get('symbol') or data.get('echo_req', {}).get('ticks')
+        price = t.get('quote') or t.get('price') or t.get('bid') or t.get('ask')
+        if not symbol or price is None:
+            return None
+        sub_id = (data.get('subscription') or {}).get('id') or t.get('id')
+        return Tick(symbol, t.get('epoch') or time.time(), float(price), sub_id)
+
+
+# ========== TICK INGESTION ==========
+class TickQueue:
+    """
+    Bounded hand-off from the socket reader to the tick consumer. put() never
+    blocks the reader. While the queue is full, a new tick either replaces any
+    waiting overflow tick of the same symbol (conflation: only the newest
+    price per symbol survives) or, with conflation off, is dropped. Overflow
+    ticks are delivered after the queued ones, so per-symbol order holds.
+    """
+    def __init__(self, maxsize=INGEST_QUEUE_SIZE, conflate=INGEST_CONFLATE):
+        self.maxsize = maxsize
+        self.conflate = conflate
+        self.items = deque()
+        self.overflow = {}  # symbol -> newest tick received while full
+        self.received = self.dropped = self.conflated = 0
+        self.ready = None   # asyncio.Event, created inside the running loop
+
+    def __len__(self):
+        return len(self.items) + len(self.overflow)
+
+    def put(self, tick):
+        self.received += 1
+        if len(self.items) < self.maxsize and not self.overflow:
+            self.items.append(tick)
+        elif self.conflate:
+            if tick.symbol in self.overflow:
+                self.conflated += 1
+            self.overflow[tick.symbol] = tick
+        else:
+            self.dropped += 1
+            return
+        if self.ready is not None:
+            self.ready.set()
+
+    async def get_batch(self, limit=INGEST_BATCH):
+        """Wait for ticks, then return up to limit of them (oldest first)."""
+        if self.ready is None:
+            self.ready = asyncio.Event()
+        while not self.items and not self.overflow:
+            self.ready.clear()
+            await self.ready.wait()
+        items = self.items
+        batch = [items.popleft() for _ in range(min(limit, len(items)))]
+        if not items and self.overflow:
+            batch.extend(self.overflow.values())
+            self.overflow = {}
+        return batch
+
+
 # ========== WEBSOCKET LISTENER ==========
-async def deriv_ws_listener():
-    async with websockets.connect(DERIV_WS_URL) as ws:
-        # optional: authorize if you have a token (not required for market data subscribe)
-        if DERIV_TOKEN:
-            await ws.send(json.dumps({"authorize": DERIV_TOKEN}))
-            auth_resp = json.loads(await ws.recv())
-            print("Auth response:", auth_resp)
-
-        print("Connected to Deriv websockets.")
-        # Keep listening and dispatch ticks to market manager
-        while True:
-            msg = await ws.recv()
+class DerivAPIError(Exception):
+    """Error response from the Deriv API."""
+
+
+class DerivFeed:
+    """
+    Owns the long-lived Deriv websocket and every `ticks` subscription on it.
+    The rest of the app asks for data with subscribe()/unsubscribe(); requests
+    are reference-counted, so a symbol stays subscribed while anyone needs it
+    and is forgotten when the last user lets go. Subscriptions requested before
+    the connection is up are sent as soon as it is.
+    """
+    def __init__(self, market, url=DERIV_WS_URL, token=DERIV_TOKEN, queue=None, name="feed"):
+        self.market = market
+        self.url = url
+        self.token = token
+        self.name = name
+        self.ws = None
+        self.refs = {}     # symbol -> number of active users
+        self.sub_ids = {}  # symbol -> Deriv subscription id
+        self.pending = {}  # req_id -> future waiting for its response
+        self.last_req_id = 0
+        self.tasks = set() # background helpers (gap backfills)
+        self.decoder = FrameDecoder()
+        # ticks go to this queue; a feed that creates its own queue also runs its consumer
+        self.owns_queue = queue is None
+        self.queue = TickQueue() if queue is None else queue
+        self.on_disconnect = None  # callback(feed), set by FeedPool
+        self.on_drop = None  # callback(feed, symbol) after a permanent subscribe error
+        self.retrying = set()  # symbols with a subscribe retry scheduled
+
+    @property
+    def connected(self):
+        return self.ws is not None
+
+    async def subscribe(self, symbol):
+        self.refs[symbol] = self.refs.get(symbol, 0) + 1
+        if self.refs[symbol] == 1 and self.connected:
+            await self._send({"ticks": symbol, "subscribe": 1})
+
+    async def unsubscribe(self, symbol):
+        refs = self.refs.get(symbol, 0) - 1
+        if refs > 0:
+            self.refs[symbol] = refs
+            return
+        self.refs.pop(symbol, None)
+        sub_id = self.sub_ids.pop(symbol, None)
+        if sub_id and self.connected:
+            await self._send({"forget": sub_id})
+        # if the subscription id has not arrived yet, _dispatch forgets it when it does
+
+    async def request(self, payload, timeout=REQUEST_TIMEOUT):
+        """
+        Send an API call (ticks_history, active_symbols, forget, ...) on the
+        shared connection and wait for its response. Each call is tagged with a
+        fresh req_id and the dispatch loop resolves the matching future, so any
+        number of calls can be in flight at once. Raises asyncio.TimeoutError,
+        DerivAPIError for error responses, or ConnectionError if the connection
+        drops first; cancelling the caller abandons the call.
+        """
+        await self.wait_connected(timeout)
+        self.last_req_id += 1
+        req_id = self.last_req_id
+        fut = self.pending[req_id] = asyncio.get_running_loop().create_future()
+        try:
+            await self._send(dict(payload, req_id=req_id))
+            return await asyncio.wait_for(fut, timeout)
+        finally:
+            self.pending.pop(req_id, None)
+
+    async def wait_connected(self, timeout):
+        deadline = time.time() + timeout
+        while not self.connected:
+            if time.time() > deadline:
+                raise ConnectionError("not connected to Deriv")
+            await asyncio.sleep(0.05)
+
+    async def _send(self, payload):
+        await self.ws.send(json.dumps(payload))
+
+    async def run(self):
+        """
+        Keep the connection up for as long as the task runs. A dropped
+        connection is retried with jittered exponential backoff; every
+        (re)connect resubscribes all active symbols and backfills the ticks
+        missed while disconnected.
+        """
+        delay = RECONNECT_MIN_DELAY
+        consumer = asyncio.create_task(consume_ticks(self.queue, self.market)) if self.owns_queue else None
+        try:
+            while True:
+                started = time.time()
+                try:
+                    await self._run_connection()
+                    print("[warn] Deriv connection closed")
+                except Exception as e:
+                    print(f"[warn] Deriv connection lost: {e!r}")
+                if time.time() - started > RECONNECT_MAX_DELAY:
+                    # the connection was healthy for a while; start the backoff over
+                    delay = RECONNECT_MIN_DELAY
+                wait = delay * random.uniform(0.5, 1.0)
+                print(f"[info] reconnecting in {wait:.1f}s...")
+                await asyncio.sleep(wait)
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
+        finally:
+            if consumer is not None:
+                consumer.cancel()
+
+    async def _run_connection(self):
+        async with websockets.connect(self.url) as ws:
+            # optional: authorize if you have a token (not required for market data subscribe)
+            if self.token:
+                await ws.send(json.dumps({"authorize": self.token}))
+                auth_resp = json.loads(await ws.recv())
+                print("Auth response:", auth_resp)
+            self.ws = ws
+            print(f"Connected to Deriv websockets ({self.name}).")
             try:
-                data = json.loads(msg)
-            except Exception:
-                continue
-            # Deriv sends ticks inside 'tick' objects when you subscribe
-            if 'tick' in data:
-                t = data['tick']
-                symbol = t.get('symbol') or t.get('quote') or data.get('echo_req', {}).get('subscribe')  # best-effort
-                price = t.get('quote') or t.get('price') or t.get('bid') or t.get('ask')
-                if symbol and price is not None:
-                    market.add_tick(symbol, price, ts=t.get('epoch', time.time()))
-            # We ignore other messages here (subscription confirmations etc.)
-            # To subscribe, the main thread will send subscribe requests to this websocket
-            # (We use a simpler pattern: this listener only receives; subscriptions can be made by separate short-lived connections)
-
-# Helper to create a subscription and fetch a short snapshot using a temporary connection
+                for symbol in list(self.refs):
+                    await self._send({"ticks": symbol, "subscribe": 1})
+                    self._check_gap(symbol)
+                # Keep listening and dispatch ticks to market manager
+                decode = self.decoder.decode
+                async for msg in ws:
+                    frame = decode(msg)
+                    if frame.__class__ is Tick:
+                        await self._on_tick(frame)
+                    elif frame is not None:
+                        await self._dispatch(frame)
+            finally:
+                self.ws = None
+                self.sub_ids.clear()
+                for fut in self.pending.values():
+                    if not fut.done():
+                        fut.set_exception(ConnectionError("Deriv connection closed"))
+                if self.on_disconnect is not None:
+                    self.on_disconnect(self)
+
+    def _check_gap(self, symbol):
+        """Backfill symbol in the background if its newest stored tick is older than GAP_MIN_SECONDS."""
+        ring = self.market.ticks.get(symbol)
+        if ring is not None and len(ring) and time.time() - ring.ts[ring.end - 1] > GAP_MIN_SECONDS:
+            self._spawn(self._fill_gap(symbol, ring.ts[ring.end - 1]))
+
+    async def adopt(self, symbol, refs):
+        """Take over a symbol (with its reference count) from another connection."""
+        self.refs[symbol] = self.refs.get(symbol, 0) + refs
+        if self.connected and self.refs[symbol] == refs:
+            await self._send({"ticks": symbol, "subscribe": 1})
+            self._check_gap(symbol)
+
+    async def _fill_gap(self, symbol, since):
+        """
+        Backfill ticks for symbol from `since` (last stored epoch) to now.
+        ticks_history returns the newest HISTORY_MAX_TICKS ticks of a range,
+        so longer gaps are paged backwards (up to GAP_MAX_PAGES calls) until
+        a page reaches `since`.
+        """
+        pages = []
+        end = "latest"
+        covered = False
+        for _ in range(GAP_MAX_PAGES):
+            try:
+                resp = await self.request({"ticks_history": symbol, "start": int(since), "end": end,
+                                           "style": "ticks", "count": HISTORY_MAX_TICKS})
+            except Exception as e:
+                print(f"[warn] gap backfill for {symbol} failed:", e)
+                break
+            history = resp.get('history', {})
+            times, prices = history.get('times', []), history.get('prices', [])
+            if len(times) < HISTORY_MAX_TICKS or not times or times[0] <= since:
+                pages.append((times, prices))
+                covered = True
+                break
+            # the page may hold only part of its oldest second: leave that second to the next page
+            first = bisect.bisect_right(times, times[0])
+            if first == len(times):
+                first = 0
+                end = int(times[0]) - 1
+            else:
+                end = int(times[0])
+            pages.append((times[first:], prices[first:]))
+        if not pages:
+            return
+        times = [t for page in reversed(pages) for t in page[0]]
+        prices = [p for page in reversed(pages) for p in page[1]]
+        added = self.market.merge_ticks(symbol, times, prices)
+        if not covered:
+            reached = time.strftime('%H:%M:%S', time.localtime(times[0])) if times else "now"
+            print(f"[warn] gap backfill for {symbol} incomplete: history only reaches back to {reached}")
+        if added:
+            print(f"[info] backfilled {added} ticks missed by {symbol} since {time.strftime('%H:%M:%S', time.localtime(since))}")
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _retry_subscribe(self, symbol):
+        """Re-send a ticks subscribe that failed with a transient error, while anyone still wants it."""
+        try:
+            await asyncio.sleep(SUBSCRIBE_RETRY_SECONDS)
+            if symbol in self.refs and symbol not in self.sub_ids and self.connected:
+                print(f"[info] retrying the {symbol} subscription on {self.name}")
+                await self._send({"ticks": symbol, "subscribe": 1})
+        finally:
+            self.retrying.discard(symbol)
+
+    async def _dispatch(self, data):
+        fut = self.pending.get(data.get('req_id'))
+        if fut is not None:
+            if not fut.done():
+                if 'error' in data:
+                    err = data['error']
+                    fut.set_exception(DerivAPIError(f"{err.get('code')}: {err.get('message')}"))
+                else:
+                    fut.set_result(data)
+            return
+        if 'error' in data:
+            echo = data.get('echo_req', {})
+            symbol = echo.get('ticks')
+            code = data['error'].get('code')
+            print(f"[error] {data.get('msg_type')} {symbol or ''}: {data['error'].get('message')}")
+            if symbol not in self.refs:
+                return
+            if code in PERMANENT_SUBSCRIBE_ERRORS:
+                # the symbol can never be subscribed; drop it so it is not retried on reconnect
+                self.refs.pop(symbol, None)
+                if self.on_drop is not None:
+                    self.on_drop(self, symbol)
+            elif code != "AlreadySubscribed" and symbol not in self.retrying:
+                self.retrying.add(symbol)
+                self._spawn(self._retry_subscribe(symbol))
+            return
+        # Deriv sends ticks inside 'tick' objects when you subscribe
+        if 'tick' in data:
+            tick = FrameDecoder.from_dict(data)
+            if tick is not None:
+                await self._on_tick(tick)
+        # other messages (forget confirmations etc.) need no handling
+
+    async def _on_tick(self, tick):
+        symbol = tick.symbol
+        if tick.sub_id and symbol not in self.sub_ids:
+            self.sub_ids[symbol] = tick.sub_id
+            if symbol not in self.refs:
+                # unsubscribed before the subscription was confirmed
+                self.sub_ids.pop(symbol)
+                await self._send({"forget": tick.sub_id})
+                return
+        self.queue.put(tick)
+
+    def stats(self):
+        q = self.queue
+        return {"connected": self.connected, "subscriptions": len(self.refs), "pending_requests": len(self.pending),
+                "queued": len(q), "received": q.received, "dropped": q.dropped, "conflated": q.conflated}
+
+
+async def consume_ticks(queue, market):
+    """Apply queued ticks to MarketData in batches, yielding to the socket readers between batches."""
+    add_tick = market.add_tick
+    while True:
+        batch = await queue.get_batch()
+        for tick in batch:
+            try:
+                add_tick(tick.symbol, tick.quote, ts=tick.epoch)
+            except Exception as e:
+                print(f"[error] failed to store tick for {tick.symbol}:", e)
+        if market.on_batch is not None:
+            try:
+                market.on_batch({tick.symbol for tick in batch})
+            except Exception as e:
+                print("[error] batch callback failed:", e)
+        await asyncio.sleep(0)
+
+
+class FeedPool:
+    """
+    Shards ticks subscriptions across `size` DerivFeed connections (at most
+    FEED_MAX_SUBSCRIPTIONS each) behind the same subscribe/unsubscribe/request
+    API as a single feed. New symbols go to the least loaded live connection.
+    When a connection drops, its symbols are moved to live connections with
+    room (and backfilled); whatever cannot be placed stays put and is
+    resubscribed when that connection comes back. All connections feed one
+    TickQueue and one MarketData.
+    """
+    def __init__(self, market, size=FEED_CONNECTIONS, max_subscriptions=FEED_MAX_SUBSCRIPTIONS,
+                 url=DERIV_WS_URL, token=DERIV_TOKEN):
+        self.market = market
+        self.max_subscriptions = max_subscriptions
+        self.queue = TickQueue()
+        self.feeds = [DerivFeed(market, url, token, queue=self.queue, name=f"conn {i + 1}/{size}")
+                      for i in range(size)]
+        for f in self.feeds:
+            f.on_disconnect = self._on_disconnect
+            f.on_drop = self._on_drop
+        self.owner = {}  # symbol -> DerivFeed holding its subscription
+        self.on_drop = None  # callback(pool, symbol) when a connection drops a symbol for good
+        self.next_request = 0
+        self.tasks = set()
+
+    @property
+    def url(self):
+        return self.feeds[0].url
+
+    @url.setter
+    def url(self, url):
+        for f in self.feeds:
+            f.url = url
+
+    @property
+    def connected(self):
+        return any(f.connected for f in self.feeds)
+
+    @property
+    def refs(self):
+        refs = {}
+        for f in self.feeds:
+            refs.update(f.refs)
+        return refs
+
+    def _pick(self, exclude=None, connected_only=False):
+        """Least loaded connection with room, preferring live ones; None if all are full."""
+        candidates = [f for f in self.feeds if f is not exclude and len(f.refs) < self.max_subscriptions
+                      and (f.connected or not connected_only)]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda f: (not f.connected, len(f.refs)))
+
+    async def subscribe(self, symbol):
+        conn = self.owner.get(symbol)
+        if conn is None or symbol not in conn.refs:
+            conn = self._pick()
+            if conn is None:
+                raise RuntimeError(f"all {len(self.feeds)} feed connections are at {self.max_subscriptions} subscriptions; "
+                                   "raise FEED_CONNECTIONS or FEED_MAX_SUBSCRIPTIONS")
+            self.owner[symbol] = conn
+        await conn.subscribe(symbol)
+
+    async def unsubscribe(self, symbol):
+        conn = self.owner.get(symbol)
+        if conn is None:
+            return
+        await conn.unsubscribe(symbol)
+        if symbol not in conn.refs:
+            self.owner.pop(symbol, None)
+
+    async def request(self, payload, timeout=REQUEST_TIMEOUT):
+        """Send an API call on one of the live connections (round robin)."""
+        live = [f for f in self.feeds if f.connected] or self.feeds
+        self.next_request += 1
+        return await live[self.next_request % len(live)].request(payload, timeout)
+
+    async def wait_connected(self, timeout):
+        deadline = time.time() + timeout
+        while not self.connected:
+            if time.time() > deadline:
+                raise ConnectionError("not connected to Deriv")
+            await asyncio.sleep(0.05)
+
+    async def active_symbols(self):
+        """Symbols of every instrument Deriv currently offers."""
+        resp = await self.request({"active_symbols": "brief"})
+        return [s['symbol'] for s in resp.get('active_symbols', [])]
+
+    def _on_drop(self, conn, symbol):
+        if self.owner.get(symbol) is conn:
+            self.owner.pop(symbol, None)
+        if self.on_drop is not None:
+            self.on_drop(self, symbol)
+
+    def _on_disconnect(self, dead):
+        task = asyncio.create_task(self._rebalance(dead))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _rebalance(self, dead):
+        moved = 0
+        for symbol, refs in list(dead.refs.items()):
+            target = self._pick(exclude=dead, connected_only=True)
+            if target is None:
+                break
+            dead.refs.pop(symbol, None)
+            self.owner[symbol] = target
+            await target.adopt(symbol, refs)
+            moved += 1
+        if moved:
+            print(f"[info] moved {moved} subscriptions off {dead.name}, {len(dead.refs)} left waiting for it to reconnect")
+
+    async def run(self):
+        consumer = asyncio.create_task(consume_ticks(self.queue, self.market))
+        try:
+            await asyncio.gather(*(f.run() for f in self.feeds))
+        finally:
+            consumer.cancel()
+
+    def stats(self):
+        q = self.queue
+        return {"connections": f"{sum(f.connected for f in self.feeds)}/{len(self.feeds)} connected",
+                "subscriptions": " + ".join(str(len(f.refs)) for f in self.feeds),
+                "pending_requests": sum(len(f.pending) for f in self.feeds),
+                "queued": len(q), "received": q.received, "dropped": q.dropped, "conflated": q.conflated}
+
+feed = FeedPool(market)
+
+async def backfill(symbol, seconds, timeframe=None):
+    """
+    Fill the last `seconds` of tick history for symbol with a single
+    ticks_history call and merge it into the market cache. When timeframe
+    (seconds) is a maintained bar timeframe Deriv serves candles for, the bar
+    history is filled from a candles call sent alongside. Returns the number
+    of new ticks.
+    """
+    now = time.time()
+    calls = [feed.request({"ticks_history": symbol, "start": int(now - seconds), "end": "latest",
+                           "style": "ticks", "count": HISTORY_MAX_TICKS})]
+    want_candles = timeframe in CANDLE_GRANULARITIES and timeframe in market.bar_timeframes
+    if want_candles:
+        calls.append(feed.request({"ticks_history": symbol, "start": int(now - timeframe * (BAR_HISTORY + 1)),
+                                   "end": "latest", "style": "candles", "granularity": timeframe,
+                                   "count": BAR_HISTORY}))
+    responses = await asyncio.gather(*calls, return_exceptions=True)
+    if isinstance(responses[0], BaseException):
+        raise responses[0]
+    history = responses[0].get('history', {})
+    added = market.merge_ticks(symbol, history.get('times', []), history.get('prices', []))
+    if want_candles:
+        if isinstance(responses[1], BaseException):
+            print(f"[warn] candles backfill for {symbol} failed:", responses[1])
+        else:
+            # the newest candle is still forming; only finished ones become bars
+            bars = [Bar(float(c['epoch']), float(c['open']), float(c['high']), float(c['low']), float(c['close']), 0)
+                    for c in responses[1].get('candles', []) if c['epoch'] + timeframe <= now]
+            market.merge_bars(symbol, timeframe, bars)
+    return added
+
+# Helper to make sure a symbol is streaming and give it a short time to collect ticks
 async def subscribe_and_fetch(symbol, duration_seconds=60):
-    """Subscribe to ticks for symbol and collect for duration_seconds (non-blocking if short)."""
-    url = DERIV_WS_URL
-    collected = []
-    async with websockets.connect(url) as ws:
-        # optional auth if DERIV_TOKEN
-        if DERIV_TOKEN:
-            await ws.send(json.dumps({"authorize": DERIV_TOKEN}))
-            _ = json.loads(await ws.recv())
-        # subscribe to ticks (Deriv 'ticks' request)
-        req = {"ticks": symbol, "subscribe": 1}
-        await ws.send(json.dumps(req))
-        start = time.time()
-        while time.time() - start < duration_seconds:
-            msg = await asyncio.wait_for(ws.recv(), timeout=duration_seconds)
-            data = json.loads(msg)
-            if 'tick' in data:
-                t = data['tick']
-                price = t.get('quote') or t.get('price')
-                epoch = t.get('epoch', time.time())
-                collected.append((epoch, float(price)))
-                # also keep in the global market cache
-                market.add_tick(symbol, price, ts=epoch)
-        # unsubscribe
-        await ws.send(json.dumps({"forget": req}))
-    return collected
+    """Subscribe to ticks for symbol on the shared feed and collect for duration_seconds."""
+    start = time.time()
+    await feed.subscribe(symbol)
+    try:
+        await asyncio.sleep(duration_seconds)
+    finally:
+        await feed.unsubscribe(symbol)
+    ring = market.ticks[symbol] if symbol in market.ticks else None
+    if ring is None:
+        return []
+    i = ring.index_since(start)
+    return list(zip(ring.timestamps(i), ring.values(i)))
 
 # ========== USER INTERFACE (console) ==========
+# Deriv symbols the console holds a feed subscription for
+signal_symbols = set()
+
+async def monitor_symbol(deriv_sym):
+    """Hold a console subscription for deriv_sym. Returns False if the feed has no room for it."""
+    if deriv_sym in signal_symbols:
+        return True
+    try:
+        await feed.subscribe(deriv_sym)
+    except RuntimeError as e:
+        print("[warn] not streaming", deriv_sym + ":", e)
+        return False
+    signal_symbols.add(deriv_sym)
+    return True
+
+def _forget_symbol(_, deriv_sym):
+    # the feed dropped the symbol after a permanent error; a later request may subscribe it again
+    signal_symbols.discard(deriv_sym)
+
+feed.on_drop = _forget_symbol
+
 def format_symbol(user_sym):
     # map user friendly name to deriv symbol
     return SYMBOL_MAP.get(user_sym, user_sym)
 
-async def handle_signal_command(user_sym, timeframe='1m', expiration='2m'):
+class SignalCache:
+    """
+    LRU of strategy results keyed on (symbol, timeframe, strategy, params,
+    seq, window start). The symbol's tick sequence number changes with every
+    stored tick and the start index changes as old ticks leave the window, so
+    a hit means the strategy would see exactly the same prices.
+    """
+    def __init__(self, maxsize=SIGNAL_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def stats(self):
+        return {"signal_cache": len(self.entries), "cache_hits": self.hits, "cache_misses": self.misses}
+
+signal_cache = SignalCache()
+
+def sma_lengths(tf_seconds, rate=1.0):
+    """Fast/slow crossover lengths (in ticks) for a timeframe on a symbol ticking `rate` times per second."""
+    if rate > 0:
+        # quantize to ~19% steps so a drifting rate keeps reusing the same few RunningMeans
+        rate = 2.0 ** (round(math.log2(rate) * 4) / 4)
+    ticks = int(tf_seconds * rate)
+    return max(3, ticks//6), max(8, ticks//2)
+
+def evaluate_signal(deriv_sym, tf_seconds, strategy='sma'):
+    """
+    Run strategy on the cached ticks of the last tf_seconds (no fetching).
+    Returns (signal, info, last_price), or None without recent prices.
+    Results are served from signal_cache while the window is unchanged.
+    """
+    params = sma_lengths(tf_seconds, market.tick_rate(deriv_sym)) if strategy == 'sma' else ()
+    key = (deriv_sym, tf_seconds, strategy, params) + market.window_start(deriv_sym, tf_seconds)
+    cached = signal_cache.get(key)
+    if cached is not None:
+        return cached
+    # The crossover runs on raw ticks in the last tf_seconds window. Finished OHLC bars for the
+    # BAR_TIMEFRAMES are also available via market.get_bars(deriv_sym, timeframe) for bar-based strategies.
+    window_prices = market.get_prices_since(deriv_sym, tf_seconds)
+    if not window_prices:
+        return None
+    if strategy == 'sma':
+        fast_len, slow_len = params
+        # the running means cover the last N ticks of the symbol, which are the last N of the
+        # window whenever compute_signal has enough data to use them
+        signal, info = compute_signal(window_prices, fast_len=fast_len, slow_len=slow_len,
+                                      fast_ma=market.sma(deriv_sym, fast_len),
+                                      slow_ma=market.sma(deriv_sym, slow_len))
+    else:
+        signal, info = STRATEGIES[strategy](window_prices)
+    result = (signal, info, window_prices[-1])
+    signal_cache.put(key, result)
+    return result
+
+async def handle_signal_command(user_sym, timeframe='1m', expiration='2m', strategy='sma'):
+    if strategy not in STRATEGIES:
+        return {"signal":"HOLD", "reason": f"unknown strategy {strategy}, use one of {', '.join(STRATEGIES)}"}
     deriv_sym = format_symbol(user_sym)
     tf_seconds = parse_duration(timeframe)
     exp_seconds = parse_duration(expiration)
 
-    # Make sure we have some recent data: if not, quickly fetch a short sample (2 * timeframe)
+    # keep streaming every symbol we have been asked about so later requests hit a warm cache
+    await monitor_symbol(deriv_sym)
+
+    # Make sure we have some recent data: if the lookback (3 * timeframe) holds less than one
+    # timeframe's worth of ticks at the symbol's tick rate, fetch history
     lookback = tf_seconds * 3
-    prices = market.get_prices_since(deriv_sym, lookback)
-    if len(prices) < max(10, tf_seconds // 1):
-        # fetch short sample (non-blocking short wait)
-        print(f"[info] not enough cached ticks for {deriv_sym}, fetching {max(5, tf_seconds)}s snapshot from Deriv...")
+    if market.count_since(deriv_sym, lookback) < max(10, int(tf_seconds * market.tick_rate(deriv_sym))):
+        # fill the missing lookback from Deriv's tick history in one round trip
+        print(f"[info] not enough cached ticks for {deriv_sym}, backfilling {lookback}s of history from Deriv...")
         try:
-            collected = await subscribe_and_fetch(deriv_sym, duration_seconds=min(10, max(5, tf_seconds)))
-            prices = market.get_prices_since(deriv_sym, lookback)
+            await backfill(deriv_sym, lookback, timeframe=tf_seconds)
         except Exception as e:
-            print("[error] failed to fetch data:", e)
-            return {"signal":"HOLD", "reason": "failed to retrieve data"}
+            # fall back to collecting a short live sample (non-blocking short wait)
+            print(f"[warn] history backfill failed ({e}), collecting {min(10, max(5, tf_seconds))}s of live ticks...")
+            try:
+                await subscribe_and_fetch(deriv_sym, duration_seconds=min(10, max(5, tf_seconds)))
+            except Exception as e:
+                print("[error] failed to fetch data:", e)
+                return {"signal":"HOLD", "reason": "failed to retrieve data"}
 
-    # aggregate prices into timeframe bars (simple: take last price per second and then sample per timeframe)
-    # For simplicity we'll use the raw tick prices in last tf_seconds window
-    window_prices = market.get_prices_since(deriv_sym, tf_seconds)
-    if not window_prices:
+    evaluated = evaluate_signal(deriv_sym, tf_seconds, strategy)
+    if evaluated is None:
         return {"signal":"HOLD", "reason":"no recent prices"}
-
-    signal, info = compute_signal(window_prices, fast_len=max(3, tf_seconds//6), slow_len=max(8, tf_seconds//2))
+    signal, info, last_price = evaluated
+    outcomes.record(deriv_sym, timeframe, expiration, strategy, signal, last_price,
+                    key=(deriv_sym, tf_seconds, strategy, expiration, market.seq.get(deriv_sym, 0)))
     result = {
         "symbol": deriv_sym,
         "user_symbol": user_sym,
         "timeframe": timeframe,
         "expiration": expiration,
+        "strategy": strategy,
         "signal": signal,
         "info": info,
-        "last_price": window_prices[-1],
+        "last_price": last_price,
+        "tick_rate": market.tick_rate(deriv_sym),
         "timestamp": time.time()
     }
     return result
 
-async def main_console():
-    # Start a background listener to keep collecting ticks (optional)
-    listener_task = asyncio.create_task(deriv_ws_listener())
+# ========== MARKET SCAN ==========
+# console table order: actionable signals first
+SIGNAL_RANK = {"BUY": 0, "SELL": 0, "HOLD": 1}
+
+def scan_signals(symbols=None, timeframes=('1m',), strategy='sma'):
+    """
+    Evaluate `strategy` for every symbol x timeframe on the ticks already in
+    MarketData (no requests are made; uncached symbols come back as HOLD).
+    Returns rows ranked by rank_scan(). For 'sma' the crossover of every
+    combination is computed in one NumPy pass: the windows of all symbols are
+    concatenated, summed cumulatively once, and each fast/slow mean is a
+    difference of two cumulative sums. Other strategies run per window.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"unknown strategy {strategy}, use one of {', '.join(STRATEGIES)}")
+    symbols = list(market.ticks) if symbols is None else list(symbols)
+    tfs = [(tf, parse_duration(tf)) for tf in timeframes]
+    if not symbols or not tfs:
+        return []
+    now = time.time()
+    longest = max(sec for _, sec in tfs)
+    if strategy == 'sma':
+        rows = _scan_sma(symbols, tfs, now, longest)
+    else:
+        rows = []
+        for sym in symbols:
+            ring = market.ticks.get(sym)
+            for tf, sec in tfs:
+                prices = ring.values(ring.index_since(now - sec)) if ring is not None else []
+                if len(prices):
+                    signal, info = STRATEGIES[strategy](prices)
+                    last = prices[-1]
+                else:
+                    signal, info, last = "HOLD", "no recent prices", None
+                rows.append(_scan_row(sym, tf, strategy, signal, info, last, len(prices)))
+    return rank_scan(rows)
+
+def _scan_sma(symbols, tfs, now, longest):
+    # one contiguous float64 column holding the longest window of every symbol
+    chunks, offsets, starts = [], [], []
+    size = 0
+    for sym in symbols:
+        ring = market.ticks.get(sym)
+        if ring is None or not len(ring):
+            chunks.append(array('d'))
+            offsets.append(size)
+            starts.append([0] * len(tfs))
+            continue
+        first = ring.index_since(now - longest)
+        window_ts = ring.timestamps(first)
+        chunks.append(ring.values(first))
+        offsets.append(size)
+        # where each timeframe's window starts inside the longest one
+        starts.append([bisect.bisect_left(window_ts, now - sec) for _, sec in tfs])
+        size += ring.end - first
+    prices = np.empty(size)
+    for chunk, off in zip(chunks, offsets):
+        prices[off:off + len(chunk)] = np.frombuffer(chunk, dtype=np.float64)
+    lengths = np.array([len(c) for c in chunks])
+    firsts = np.array([c[0] if len(c) else 0.0 for c in chunks])
+    base = np.repeat(firsts, lengths)
+    # cumulative sum of prices relative to each symbol's first price, with a leading zero
+    csum = np.zeros(size + 1)
+    np.cumsum(prices - base, out=csum[1:])
+
+    # one entry per symbol x timeframe combination
+    nsym, ntf = len(symbols), len(tfs)
+    off = np.repeat(offsets, ntf)
+    end = off + np.repeat(lengths, ntf)
+    count = end - (off + np.array(starts).ravel())
+    sma_len = np.array([sma_lengths(sec, market.tick_rate(sym)) for sym in symbols for _, sec in tfs]).reshape(-1, 2)
+    fast_len, slow_len = sma_len[:, 0], sma_len[:, 1]
+    ok = (count >= np.maximum(fast_len, slow_len)) & (count >= 3)
+    # indices are clipped so combinations without enough data stay in bounds; they are masked by ok
+    sym_base = np.repeat(firsts, ntf)
+    fast_ma = (csum[end] - csum[np.maximum(end - fast_len, 0)]) / fast_len + sym_base
+    slow_ma = (csum[end] - csum[np.maximum(end - slow_len, 0)]) / slow_len + sym_base
+    last = prices[np.maximum(end - 1, 0)] if size else np.zeros(len(end))
+    slope = (last - prices[np.maximum(end - 3, 0)]) / 2.0 if size else np.zeros(len(end))
+    buy = ok & (fast_ma > slow_ma) & (slope > 0)
+    sell = ok & (fast_ma < slow_ma) & (slope < 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        strength = np.where(ok, np.abs(fast_ma - slow_ma) / slow_ma, 0.0)
+
+    rows = []
+    for i in range(nsym * ntf):
+        sym, (tf, _) = symbols[i // ntf], tfs[i % ntf]
+        n = int(count[i])
+        if not n:
+            rows.append(_scan_row(sym, tf, 'sma', "HOLD", "no recent prices", None, 0))
+            continue
+        if not ok[i]:
+            rows.append(_scan_row(sym, tf, 'sma', "HOLD", "not enough data", float(last[i]), n))
+            continue
+        signal = "BUY" if buy[i] else "SELL" if sell[i] else "HOLD"
+        info = f"fast_ma {fast_ma[i]:.5f}, slow_ma {slow_ma[i]:.5f}, slope {slope[i]:.6f}"
+        rows.append(_scan_row(sym, tf, 'sma', signal, info, float(last[i]), n, float(strength[i])))
+    return rows
+
+def _scan_row(symbol, timeframe, strategy, signal, info, last_price, ticks, strength=0.0):
+    return {"symbol": symbol, "timeframe": timeframe, "strategy": strategy, "signal": signal,
+            "strength": strength, "info": info, "last_price": last_price, "ticks": ticks}
+
+def rank_scan(rows):
+    """Order scan rows: BUY/SELL before HOLD, then by strength (relative MA spread for sma), then symbol."""
+    return sorted(rows, key=lambda r: (SIGNAL_RANK.get(r["signal"], 1), -r["strength"], r["symbol"], r["timeframe"]))
+
+def print_scan(rows, top=20, elapsed=None):
+    actionable = sum(1 for r in rows if r["signal"] != "HOLD")
+    timing = f" in {elapsed * 1000:.1f} ms" if elapsed is not None else ""
+    print(f"----- SCAN: {len(rows)} combinations, {actionable} actionable{timing} -----")
+    print(f"{'signal':<6} {'symbol':<16} {'tf':<5} {'strength':>9} {'price':>12} {'ticks':>7}  info")
+    for r in rows[:top]:
+        price = f"{r['last_price']:.5f}" if r["last_price"] is not None else "-"
+        print(f"{r['signal']:<6} {r['symbol']:<16} {r['timeframe']:<5} {r['strength']:>9.2e} "
+              f"{price:>12} {r['ticks']:>7}  {r['info']}")
+    if len(rows) > top:
+        print(f"... {len(rows) - top} more (top=N to show more)")
+    print("-" * 40)
+
+# ========== BACKTEST ==========
+def backtest_symbol(deriv_sym, timeframe='1m', expiration='2m', strategy='sma',
+                    payout=backtest.DEFAULT_PAYOUT, every=0):
+    """Replay strategy over every tick MarketData holds for deriv_sym (see backtest.py)."""
+    ring = market.ticks.get(deriv_sym)
+    if ring is None or len(ring) < 3:
+        raise ValueError(f"no stored ticks for {deriv_sym}")
+    tf_seconds = parse_duration(timeframe)
+    params = {}
+    if strategy == 'sma':
+        fast_len, slow_len = sma_lengths(tf_seconds, market.tick_rate(deriv_sym))
+        params = {"fast_len": fast_len, "slow_len": slow_len}
+    ts = np.frombuffer(ring.timestamps(), dtype=np.float64)
+    prices = np.frombuffer(ring.values(), dtype=np.float64)
+    result = backtest.run_backtest(ts, prices, strategy, tf_seconds, parse_duration(expiration),
+                                   payout, every, **params)
+    result.update(symbol=deriv_sym, timeframe=timeframe, expiration=expiration,
+                  span=float(ts[-1] - ts[0]))
+    return result
+
+async def _worker_backtest(*args):
+    return backtest_symbol(*args)
+
+async def _worker_ticks(deriv_sym):
+    ring = market.ticks.get(deriv_sym)
+    if ring is None:
+        return array('d'), array('d')
+    return array('d', ring.timestamps()), array('d', ring.values())
+
+async def sweep_symbol(deriv_sym, engine=None, timeframes=('1m',), expirations=None, workers=None):
+    """
+    Run backtest.sweep over the ticks stored for deriv_sym in a thread, so the
+    feed keeps running. With --workers the owning worker ships its ticks here
+    first (worker processes cannot start a pool of their own).
+    """
+    if engine:
+        ts, prices = await engine.call(deriv_sym, "ticks", deriv_sym)
+    else:
+        ts, prices = await _worker_ticks(deriv_sym)
+    if len(ts) < 3:
+        raise ValueError(f"no stored ticks for {deriv_sym}")
+    tfs = [parse_duration(tf) for tf in timeframes]
+    exps = [parse_duration(e) for e in expirations] if expirations else backtest.SWEEP_EXPIRATIONS
+    loop = asyncio.get_running_loop()
+    return len(ts), await loop.run_in_executor(
+        None, lambda: backtest.sweep(ts, prices, timeframes=tfs, expirations=exps, workers=workers))
+
+# ========== SIGNAL WATCH ==========
+Watch = namedtuple("Watch", "symbol user_symbol timeframe expiration strategy")
+
+class SignalWatcher:
+    """
+    Streaming signals: registered watches are re-evaluated from the tick
+    consumer whenever a batch of live ticks touches their symbol, and
+    subscribers are called with an event only when a watch's signal changes
+    (HOLD -> BUY etc.). Unchanged windows are answered by signal_cache, so
+    symbols ticking without moving the inputs cost a dict lookup.
+    """
+    def __init__(self):
+        self.watches = {}  # deriv symbol -> {(timeframe seconds, strategy): Watch}
+        self.state = {}  # (symbol, timeframe seconds, strategy) -> last signal
+        self.subscribers = []  # callback(event dict)
+        self.emitted = 0
+
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
+
+    def add(self, watch, signal=None):
+        """Register watch; `signal` is its current state, if already known. Returns the watch key."""
+        tf_seconds = parse_duration(watch.timeframe)
+        self.watches.setdefault(watch.symbol, {})[(tf_seconds, watch.strategy)] = watch
+        key = (watch.symbol, tf_seconds, watch.strategy)
+        self.state[key] = signal
+        market.on_batch = self.on_batch
+        return key
+
+    def remove(self, symbol=None):
+        """Drop the watches of symbol (all watches if None). Returns how many were removed."""
+        symbols = list(self.watches) if symbol is None else [symbol]
+        removed = 0
+        for sym in symbols:
+            for tf_seconds, strategy in self.watches.pop(sym, {}):
+                self.state.pop((sym, tf_seconds, strategy), None)
+                removed += 1
+        if not self.watches and market.on_batch == self.on_batch:
+            market.on_batch = None
+        return removed
+
+    def list(self):
+        return [dict(w._asdict(), signal=self.state.get((w.symbol, tf, strat)))
+                for sym in self.watches for (tf, strat), w in self.watches[sym].items()]
+
+    def on_batch(self, symbols):
+        for sym in symbols:
+            watches = self.watches.get(sym)
+            if watches:
+                for (tf_seconds, strategy), watch in list(watches.items()):
+                    self._check(watch, tf_seconds, strategy)
+
+    def _check(self, watch, tf_seconds, strategy):
+        evaluated = evaluate_signal(watch.symbol, tf_seconds, strategy)
+        if evaluated is None:
+            return
+        signal, info, last_price = evaluated
+        key = (watch.symbol, tf_seconds, strategy)
+        previous = self.state.get(key)
+        if signal == previous:
+            return
+        self.state[key] = signal
+        self.emitted += 1
+        outcomes.record(watch.symbol, watch.timeframe, watch.expiration, strategy, signal, last_price,
+                        key=(watch.symbol, tf_seconds, strategy, watch.expiration, market.seq.get(watch.symbol, 0)))
+        event = dict(watch._asdict(), previous=previous, signal=signal, info=info,
+                     last_price=last_price, timestamp=time.time())
+        for callback in self.subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                print("[error] watch subscriber failed:", e)
+
+watcher = SignalWatcher()
+
+async def watch_signal(user_sym, timeframe='1m', expiration='2m', strategy='sma'):
+    """Start streaming transitions for a pair: evaluates it once (warming its data) and registers the watch."""
+    res = await handle_signal_command(user_sym, timeframe=timeframe, expiration=expiration, strategy=strategy)
+    if "symbol" not in res:
+        raise RuntimeError(res.get("reason", "signal failed"))
+    watcher.add(Watch(res["symbol"], user_sym, timeframe, expiration, strategy), res["signal"])
+    return res
+
+async def unwatch_signal(deriv_sym=None):
+    return watcher.remove(deriv_sym)
+
+def print_watch_event(event):
+    was = event["previous"] or "-"
+    print(f"\n[watch] {event['user_symbol']} {event['timeframe']} {event['strategy']}: {was} -> {event['signal']}"
+          f" @ {event['last_price']} (exp {event['expiration']}) {event['info']}")
+
+# ========== SIGNAL OUTCOMES ==========
+class TimerWheel:
+    """
+    Hierarchical timing wheel: `levels` wheels of `slots` buckets, where a
+    bucket on level k spans slots**k units of `resolution` seconds (4 x 64
+    one-second buckets reach ~194 days). schedule() is O(1); advance() visits
+    one level-0 bucket per elapsed unit and re-files a higher-level bucket
+    into the lower levels each time the wheel below it wraps, so pending
+    timers are never scanned.
+    """
+    def __init__(self, resolution=1.0, slots=64, levels=4, now=None):
+        self.resolution = resolution
+        self.slots = slots
+        self.spans = [slots ** level for level in range(levels + 1)]
+        self.wheels = [[[] for _ in range(slots)] for _ in range(levels)]
+        self.current = int((time.time() if now is None else now) / resolution)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def schedule(self, when, item):
+        """Fire item on the first advance() at or after time `when` (seconds)."""
+        unit = max(math.ceil(when / self.resolution), self.current + 1)
+        if unit - self.current >= self.spans[-1]:
+            raise ValueError("timer is beyond the wheel's range")
+        self._file(unit, item)
+        self.count += 1
+
+    def _file(self, unit, item):
+        delta = unit - self.current
+        level = 0
+        while delta >= self.spans[level + 1]:
+            level += 1
+        self.wheels[level][(unit // self.spans[level]) % self.slots].append((unit, item))
+
+    def advance(self, now):
+        """Move the wheel to time `now` and return the items that came due."""
+        target = int(now / self.resolution)
+        due = []
+        while self.current < target:
+            self.current += 1
+            # cascade: a wrapped lower wheel pulls the next bucket down from the level above
+            for level in range(1, len(self.wheels)):
+                if self.current % self.spans[level]:
+                    break
+                index = (self.current // self.spans[level]) % self.slots
+                bucket = self.wheels[level][index]
+                self.wheels[level][index] = []
+                for unit, item in bucket:
+                    self._file(unit, item)
+            index = self.current % self.slots
+            bucket = self.wheels[0][index]
+            if bucket:
+                self.wheels[0][index] = []
+                due.extend(item for _, item in bucket)
+        self.count -= len(due)
+        return due
+
+
+PendingSignal = namedtuple("PendingSignal", "symbol timeframe expiration strategy signal entry_price entry_ts expiry key")
+
+class OutcomeTracker:
+    """
+    Records every emitted BUY/SELL and settles it once its expiration has
+    elapsed: the settlement price is the last tick at or before expiry (a
+    BUY wins above the entry price, a SELL below, equal is a draw). A signal
+    with no tick between entry and expiry is void and left out of the
+    rolling stats. Pending
+    signals sit in a TimerWheel, so resolving costs nothing per tick.
+    """
+    def __init__(self, window=OUTCOME_WINDOW):
+        self.window = window
+        self.wheel = TimerWheel()
+        self.keys = set()  # dedup: the same signal on the same ticks is recorded once
+        self.recent = {}  # (symbol, timeframe) -> deque of "win"/"loss"/"draw"
+        self.totals = {}  # (symbol, timeframe) -> {"win": n, "loss": n, "draw": n, "void": n}
+
+    def record(self, symbol, timeframe, expiration, strategy, signal, price, key=None, ts=None):
+        """
+        Track a signal entered at `price`. `ts` is the entry tick's epoch and
+        defaults to the symbol's newest stored tick, so expiry is measured on
+        the same (server) clock as the ticks it settles on.
+        """
+        if signal not in ("BUY", "SELL"):
+            return False
+        if key is not None:
+            if key in self.keys:
+                return False
+            self.keys.add(key)
+        if ts is None:
+            ring = market.ticks.get(symbol)
+            ts = ring.ts[ring.end - 1] if ring is not None and len(ring) else time.time()
+        expiry = ts + parse_duration(expiration)
+        self.wheel.schedule(expiry + OUTCOME_GRACE,
+                            PendingSignal(symbol, timeframe, expiration, strategy, signal, price, ts, expiry, key))
+        return True
+
+    def resolve(self, now=None):
+        """Settle everything that has expired; returns the number settled."""
+        due = self.wheel.advance(time.time() if now is None else now)
+        for pending in due:
+            self.keys.discard(pending.key)
+            self._settle(pending)
+        return len(due)
+
+    def _settle(self, p):
+        ring = market.ticks.get(p.symbol)
+        outcome = "void"  # no tick to settle on (symbol evicted or never ticked again)
+        if ring is not None and len(ring):
+            i = bisect.bisect_right(ring.ts, p.expiry, ring.head, ring.end) - 1
+            # only a tick after the entry tick settles; otherwise the feed stalled
+            if i >= ring.head and ring.ts[i] > p.entry_ts:
+                move = ring.prices[i] - p.entry_price
+                if p.signal == "SELL":
+                    move = -move
+                outcome = "win" if move > 0 else "loss" if move < 0 else "draw"
+        key = (p.symbol, p.timeframe)
+        totals = self.totals.setdefault(key, {"win": 0, "loss": 0, "draw": 0, "void": 0})
+        totals[outcome] += 1
+        if outcome != "void":
+            self.recent.setdefault(key, deque(maxlen=self.window)).append(outcome)
+
+    def stats(self):
+        """One row per symbol/timeframe with rolling (last `window`) and all-time outcome counts."""
+        pending = {}
+        for wheel in self.wheel.wheels:
+            for bucket in wheel:
+                for _, p in bucket:
+                    pending[(p.symbol, p.timeframe)] = pending.get((p.symbol, p.timeframe), 0) + 1
+        rows = []
+        for key in sorted(set(self.totals) | set(pending)):
+            recent = self.recent.get(key, ())
+            wins = sum(1 for o in recent if o == "win")
+            losses = sum(1 for o in recent if o == "loss")
+            rows.append({"symbol": key[0], "timeframe": key[1], "recent": len(recent),
+                         "wins": wins, "losses": losses, "draws": len(recent) - wins - losses,
+                         "win_rate": wins / (wins + losses) if wins + losses else None,
+                         "total": dict(self.totals.get(key, {})), "pending": pending.get(key, 0)})
+        return rows
+
+outcomes = OutcomeTracker()
+
+async def outcome_resolver(tracker, interval=0.25):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            tracker.resolve()
+        except Exception as e:
+            print("[error] outcome resolver failed:", e)
+
+def print_stats(rows):
+    if not rows:
+        print("No BUY/SELL signals recorded yet.")
+        return
+    print(f"{'symbol':<16} {'tf':<5} {'win rate':>9} {'W':>5} {'L':>5} {'D':>5}   {'all-time W/L/D/void':<20} {'pending':>7}")
+    for r in rows:
+        rate = f"{r['win_rate']:.1%}" if r["win_rate"] is not None else "-"
+        t = r["total"]
+        total = f"{t.get('win', 0)}/{t.get('loss', 0)}/{t.get('draw', 0)}/{t.get('void', 0)}"
+        print(f"{r['symbol']:<16} {r['timeframe']:<5} {rate:>9} {r['wins']:>5} {r['losses']:>5} {r['draws']:>5}   "
+              f"{total:<20} {r['pending']:>7}")
+    print(f"(win rate over the last {OUTCOME_WINDOW} settled signals per row)")
+
+# ========== PROCESS SHARDING ==========
+def shard_of(symbol, count):
+    """Worker index owning symbol (stable across runs, so journals stay with their shard)."""
+    return zlib.crc32(symbol.encode()) % count
+
+async def start_services(owns=None, shared_prefix=None, writer=0):
+    """Warm-start MarketData from the journal and start the feed. Returns the background tasks."""
+    tasks = []
+    if shared_prefix:
+        market.enable_shared(shared_prefix, writer)
+    if JOURNAL_DIR:
+        # warm start: repopulate the cache from the tick journal before going live
+        t0 = time.perf_counter()
+        journal = TickJournal(JOURNAL_DIR)
+        symbols, ticks = journal.load(market, owns)
+        market.journal = journal
+        tasks.append(asyncio.create_task(journal_flusher(journal)))
+        if ticks:
+            print(f"[info] warm start: {ticks} ticks for {symbols} symbols loaded in {(time.perf_counter() - t0) * 1000:.1f} ms")
+    tasks.append(asyncio.create_task(outcome_resolver(outcomes)))
+    # Start the background listener; it owns the connections and all tick subscriptions
+    tasks.append(asyncio.create_task(feed.run()))
+    return tasks
+
+def stop_services(tasks):
+    for task in tasks:
+        task.cancel()
+    if market.journal is not None:
+        market.journal.flush()
+    try:
+        market.close()
+    except BufferError:
+        pass  # a view is still referenced; the segments go away with the process
+
+async def _worker_monitor(symbols):
+    added = 0
+    for sym in symbols:
+        if not await monitor_symbol(sym):
+            break
+        added += 1
+    return added
+
+async def _worker_scan(symbols, timeframes, strategy):
+    return scan_signals(symbols, timeframes, strategy)
+
+async def _worker_stats():
+    return outcomes.stats()
+
+async def _worker_watches():
+    return watcher.list()
+
+async def _worker_status():
+    return dict(feed.stats(), symbols=len(market.ticks), streaming=len(signal_symbols),
+                watches=len(watcher.state), watch_events=watcher.emitted, pending_outcomes=len(outcomes.wheel),
+                **signal_cache.stats())
+
+# commands a worker process serves: name -> coroutine function(*args)
+WORKER_COMMANDS = {
+    "signal": handle_signal_command,
+    "monitor": _worker_monitor,
+    "status": _worker_status,
+    "scan": _worker_scan,
+    "backtest": _worker_backtest,
+    "ticks": _worker_ticks,
+    "watch": watch_signal,
+    "unwatch": unwatch_signal,
+    "watches": _worker_watches,
+    "stats": _worker_stats,
+    "active_symbols": lambda: feed.active_symbols(),
+}
+
+def worker_main(index, count, conn, shared_prefix=None):
+    """Entry point of a worker process: owns the feed, MarketData and indicators for shard `index`."""
+    try:
+        asyncio.run(_worker_loop(index, count, conn, shared_prefix))
+    except KeyboardInterrupt:
+        pass
+
+async def _worker_loop(index, count, conn, shared_prefix):
+    tasks = await start_services(owns=lambda sym: shard_of(sym, count) == index,
+                                 shared_prefix=shared_prefix, writer=index)
+    loop = asyncio.get_running_loop()
+    stopped = loop.create_future()
+
+    async def serve(msg_id, cmd, args):
+        try:
+            reply = (msg_id, True, await WORKER_COMMANDS[cmd](*args))
+        except Exception as e:
+            reply = (msg_id, False, f"{type(e).__name__}: {e}")
+        conn.send(reply)
+
+    def read_commands():
+        # blocking pipe reads stay off the event loop
+        while True:
+            try:
+                msg_id, cmd, args = conn.recv()
+            except (EOFError, OSError):
+                cmd = "stop"
+            if cmd == "stop":
+                loop.call_soon_threadsafe(lambda: stopped.done() or stopped.set_result(None))
+                return
+            asyncio.run_coroutine_threadsafe(serve(msg_id, cmd, args), loop)
+
+    # watch transitions are pushed to the coordinator as message id 0
+    watcher.subscribe(lambda event: conn.send((0, True, event)))
+    threading.Thread(target=read_commands, daemon=True).start()
+    try:
+        await stopped
+    finally:
+        stop_services(tasks)
+
+
+class WorkerClient:
+    """Coordinator-side handle of one worker process: call() sends a command and awaits its reply."""
+    def __init__(self, index, process, conn):
+        self.index = index
+        self.process = process
+        self.conn = conn
+        self.pending = {}  # message id -> future (id 0 = pushed watch event)
+        self.last_id = 0
+        self.loop = None
+        self.on_event = None  # callback(event), set by ShardedEngine
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        threading.Thread(target=self._read_replies, daemon=True).start()
+
+    def _read_replies(self):
+        while True:
+            try:
+                msg_id, ok, value = self.conn.recv()
+            except (EOFError, OSError):
+                self.loop.call_soon_threadsafe(self._fail_all)
+                return
+            self.loop.call_soon_threadsafe(self._resolve, msg_id, ok, value)
+
+    def _resolve(self, msg_id, ok, value):
+        if msg_id == 0:
+            if self.on_event is not None:
+                self.on_event(value)
+            return
+        fut = self.pending.get(msg_id)
+        if fut is not None and not fut.done():
+            if ok:
+                fut.set_result(value)
+            else:
+                fut.set_exception(RuntimeError(f"worker {self.index}: {value}"))
+
+    def _fail_all(self):
+        for fut in self.pending.values():
+            if not fut.done():
+                fut.set_exception(ConnectionError(f"worker {self.index} exited"))
+
+    async def call(self, cmd, *args):
+        if not self.process.is_alive():
+            raise ConnectionError(f"worker {self.index} is not running")
+        self.last_id += 1
+        msg_id = self.last_id
+        fut = self.pending[msg_id] = self.loop.create_future()
+        try:
+            self.conn.send((msg_id, cmd, args))
+            return await fut
+        finally:
+            self.pending.pop(msg_id, None)
+
+
+class ShardedEngine:
+    """
+    Coordinator for --workers mode. Symbols are partitioned across worker
+    processes by shard_of(); each worker runs its own feed connections,
+    MarketData shard and indicator state, so strategy CPU scales with cores.
+    Queries for a symbol go to its owner; status-style queries fan out.
+    """
+    def __init__(self, count, shared_prefix=None):
+        ctx = multiprocessing.get_context("spawn")
+        self.workers = []
+        for i in range(count):
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(target=worker_main, args=(i, count, child, shared_prefix), name=f"signal-worker-{i}", daemon=True)
+            proc.start()
+            child.close()
+            self.workers.append(WorkerClient(i, proc, parent))
+
+    def start(self, on_event=None):
+        for w in self.workers:
+            w.on_event = on_event
+            w.start()
+
+    def owner(self, symbol):
+        return self.workers[shard_of(symbol, len(self.workers))]
+
+    async def call(self, symbol, cmd, *args):
+        return await self.owner(symbol).call(cmd, *args)
+
+    async def broadcast(self, cmd, *args):
+        return await asyncio.gather(*(w.call(cmd, *args) for w in self.workers), return_exceptions=True)
+
+    def stop(self, timeout=5):
+        for w in self.workers:
+            try:
+                w.conn.send((0, "stop", ()))
+            except (OSError, BrokenPipeError):
+                pass
+        for w in self.workers:
+            w.process.join(timeout)
+            if w.process.is_alive():
+                w.process.terminate()
+
+async def main_console(workers=WORKERS, shared_prefix=SHARED_MEMORY_PREFIX):
+    engine = None
+    tasks = []
+    if workers > 0:
+        # symbols are served by worker processes; this process only routes commands
+        engine = ShardedEngine(workers, shared_prefix)
+        engine.start(on_event=print_watch_event)
+        print(f"[info] started {workers} worker processes")
+    else:
+        try:
+            tasks = await start_services(shared_prefix=shared_prefix)
+        except RuntimeError as e:
+            print("[error]", e)
+            return
+        watcher.subscribe(print_watch_event)
     print("Manual signal bot. Type 'help' for commands.")
     try:
         while True:
@@ -201,10 +2415,179 @@ async def main_console():
             cmd = parts[0].lower()
             if cmd in ('quit','exit'):
                 print("Exiting...")
-                listener_task.cancel()
                 break
             if cmd == 'help':
-                print("Commands:\n  signal <PAIR> [timeframe=1m] [expiration=2m]\n  list  -> show SYMBOL_MAP\n  add <PAIR> <DERIV_SYMBOL>\n  quit\n")
+                print("Commands:\n  signal <PAIR> [timeframe=1m] [expiration=2m] [strategy=sma|rsi|macd|bollinger]\n  list  -> show SYMBOL_MAP\n  monitor <PAIR>... | all  -> keep streaming pairs (all = every Deriv active symbol)\n  scan [PAIR...] [timeframes=1m,5m] [strategy=sma] [top=20]  -> rank signals over cached symbols\n  backtest <PAIR> [timeframe=1m] [expiration=2m] [strategy=sma] [payout=0.85] [every=0]  -> replay stored ticks\n  sweep <PAIR> [timeframes=1m,5m] [expirations=1m,2m,5m] [top=10]  -> rank sma lengths on stored ticks\n  watch <PAIR> [timeframe=1m] [expiration=2m] [strategy=sma]  -> print signal changes as ticks arrive\n  watch  -> list watches\n  unwatch <PAIR> | all\n  stats  -> win rate of emitted BUY/SELL signals per pair and timeframe\n  status -> feed and ingestion counters\n  add <PAIR> <DERIV_SYMBOL>\n  quit\n")
+                continue
+            if cmd == 'monitor' and len(parts) >= 2:
+                if parts[1].lower() == 'all':
+                    try:
+                        symbols = await (engine.workers[0].call("active_symbols") if engine else feed.active_symbols())
+                    except Exception as e:
+                        print("[error] failed to fetch active symbols:", e)
+                        continue
+                else:
+                    symbols = [format_symbol(p) for p in parts[1:]]
+                if engine:
+                    shards = {}
+                    for sym in symbols:
+                        shards.setdefault(engine.owner(sym), []).append(sym)
+                    counts = await asyncio.gather(*(w.call("monitor", syms) for w, syms in shards.items()),
+                                                  return_exceptions=True)
+                    added = sum(c for c in counts if isinstance(c, int))
+                    print(f"Streaming {added} of {len(symbols)} requested symbols across {len(shards)} workers.")
+                else:
+                    added = await _worker_monitor(symbols)
+                    print(f"Streaming {added} of {len(symbols)} requested symbols ({len(signal_symbols)} total).")
+                continue
+            if cmd == 'scan':
+                pairs, timeframes, strategy, top = [], ['1m'], 'sma', 20
+                for p in parts[1:]:
+                    if p.startswith('timeframes='):
+                        timeframes = p.split('=',1)[1].split(',')
+                    elif p.startswith('strategy='):
+                        strategy = p.split('=',1)[1]
+                    elif p.startswith('top='):
+                        top = int(p.split('=',1)[1])
+                    else:
+                        pairs.append(format_symbol(p))
+                started = time.perf_counter()
+                try:
+                    if engine:
+                        shards = {}
+                        for sym in pairs:
+                            shards.setdefault(engine.owner(sym), []).append(sym)
+                        if pairs:
+                            results = await asyncio.gather(*(w.call("scan", syms, timeframes, strategy)
+                                                            for w, syms in shards.items()))
+                        else:
+                            results = await engine.broadcast("scan", None, timeframes, strategy)
+                        rows = rank_scan([r for part in results if isinstance(part, list) for r in part])
+                    else:
+                        rows = scan_signals(pairs or None, timeframes, strategy)
+                except Exception as e:
+                    print("[error] scan failed:", e)
+                    continue
+                print_scan(rows, top, time.perf_counter() - started)
+                continue
+            if cmd == 'backtest' and len(parts) >= 2:
+                deriv_sym = format_symbol(parts[1])
+                timeframe, expiration, strategy = '1m', '2m', 'sma'
+                payout, every = backtest.DEFAULT_PAYOUT, 0
+                for p in parts[2:]:
+                    key, _, value = p.partition('=')
+                    if key == 'timeframe':
+                        timeframe = value
+                    elif key == 'expiration':
+                        expiration = value
+                    elif key == 'strategy':
+                        strategy = value
+                    elif key == 'payout':
+                        payout = float(value)
+                    elif key == 'every':
+                        every = float(value)
+                started = time.perf_counter()
+                try:
+                    args = (deriv_sym, timeframe, expiration, strategy, payout, every)
+                    res = await (engine.call(deriv_sym, "backtest", *args) if engine else _worker_backtest(*args))
+                except Exception as e:
+                    print("[error] backtest failed:", e)
+                    continue
+                print(f"----- BACKTEST {parts[1]} ({deriv_sym}) {strategy} tf {timeframe} exp {expiration} -----")
+                print(f"{res['ticks']} ticks over {res['span'] / 3600:.1f}h replayed in "
+                      f"{(time.perf_counter() - started) * 1000:.0f} ms, params {res['params']}")
+                print(backtest.format_result(res))
+                print("-" * 40)
+                continue
+            if cmd == 'sweep' and len(parts) >= 2:
+                deriv_sym = format_symbol(parts[1])
+                timeframes, expirations, top = ['1m'], None, 10
+                for p in parts[2:]:
+                    key, _, value = p.partition('=')
+                    if key == 'timeframes':
+                        timeframes = value.split(',')
+                    elif key == 'expirations':
+                        expirations = value.split(',')
+                    elif key == 'top':
+                        top = int(value)
+                started = time.perf_counter()
+                try:
+                    ticks, rows = await sweep_symbol(deriv_sym, engine, timeframes, expirations)
+                except Exception as e:
+                    print("[error] sweep failed:", e)
+                    continue
+                print(f"----- SWEEP {parts[1]} ({deriv_sym}): {len(rows)} combinations over {ticks} ticks "
+                      f"in {time.perf_counter() - started:.1f}s -----")
+                if not engine:
+                    fast_len, slow_len = sma_lengths(parse_duration(timeframes[0]), market.tick_rate(deriv_sym))
+                    print(f"(live lengths for {timeframes[0]}: fast {fast_len}, slow {slow_len})")
+                print(backtest.format_sweep(rows, top))
+                print("-" * 40)
+                continue
+            if cmd == 'watch' and len(parts) == 1:
+                if engine:
+                    lists = await engine.broadcast("watches")
+                    watches = [w for part in lists if isinstance(part, list) for w in part]
+                else:
+                    watches = watcher.list()
+                if not watches:
+                    print("No watches.")
+                for w in watches:
+                    print(f"  {w['user_symbol']} ({w['symbol']}) {w['timeframe']} {w['strategy']} exp {w['expiration']}: {w['signal']}")
+                continue
+            if cmd == 'watch':
+                pair = parts[1]
+                timeframe, expiration, strategy = '1m', '2m', 'sma'
+                for p in parts[2:]:
+                    if p.startswith('timeframe='):
+                        timeframe = p.split('=',1)[1]
+                    if p.startswith('expiration='):
+                        expiration = p.split('=',1)[1]
+                    if p.startswith('strategy='):
+                        strategy = p.split('=',1)[1]
+                if strategy not in STRATEGIES:
+                    print(f"unknown strategy {strategy}, use one of {', '.join(STRATEGIES)}")
+                    continue
+                try:
+                    if engine:
+                        deriv_sym = format_symbol(pair)
+                        res = await engine.call(deriv_sym, "watch", deriv_sym, timeframe, expiration, strategy)
+                    else:
+                        res = await watch_signal(pair, timeframe, expiration, strategy)
+                except Exception as e:
+                    print("[error] watch failed:", e)
+                    continue
+                print(f"Watching {pair} {timeframe} {strategy}: currently {res['signal']}")
+                continue
+            if cmd == 'unwatch' and len(parts) >= 2:
+                target = None if parts[1].lower() == 'all' else format_symbol(parts[1])
+                if engine:
+                    counts = await (engine.broadcast("unwatch") if target is None else engine.call(target, "unwatch", target))
+                    removed = sum(c for c in counts if isinstance(c, int)) if isinstance(counts, list) else counts
+                else:
+                    removed = watcher.remove(target)
+                print(f"Removed {removed} watches.")
+                continue
+            if cmd == 'stats':
+                if engine:
+                    shard_stats = await engine.broadcast("stats")
+                    rows = sorted((r for part in shard_stats if isinstance(part, list) for r in part),
+                                  key=lambda r: (r["symbol"], r["timeframe"]))
+                else:
+                    rows = outcomes.stats()
+                print_stats(rows)
+                continue
+            if cmd == 'status':
+                if engine:
+                    for w, st in zip(engine.workers, await engine.broadcast("status")):
+                        print(f" worker {w.index} (pid {w.process.pid}):")
+                        items = st.items() if isinstance(st, dict) else [("error", st)]
+                        for k, v in items:
+                            print(f"  {k}: {v}")
+                else:
+                    for k, v in dict(feed.stats(), watches=len(watcher.state), watch_events=watcher.emitted,
+                                     pending_outcomes=len(outcomes.wheel), **signal_cache.stats()).items():
+                        print(f"  {k}: {v}")
                 continue
             if cmd == 'list':
                 print("Known pairs:")
@@ -218,17 +2601,29 @@ async def main_console():
             if cmd == 'signal':
                 # parse args
                 if len(parts) < 2:
-                    print("Usage: signal <PAIR> [timeframe=1m] [expiration=2m]")
+                    print("Usage: signal <PAIR> [timeframe=1m] [expiration=2m] [strategy=sma]")
                     continue
                 pair = parts[1]
                 timeframe = '1m'
                 expiration = '2m'
+                strategy = 'sma'
                 for p in parts[2:]:
                     if p.startswith('timeframe='):
                         timeframe = p.split('=',1)[1]
                     if p.startswith('expiration='):
                         expiration = p.split('=',1)[1]
-                res = await handle_signal_command(pair, timeframe=timeframe, expiration=expiration)
+                    if p.startswith('strategy='):
+                        strategy = p.split('=',1)[1]
+                if engine:
+                    # workers only know Deriv symbols; resolve the pair name here
+                    deriv_sym = format_symbol(pair)
+                    try:
+                        res = await engine.call(deriv_sym, "signal", deriv_sym, timeframe, expiration, strategy)
+                        res["user_symbol"] = pair
+                    except Exception as e:
+                        res = {"signal": "HOLD", "info": str(e)}
+                else:
+                    res = await handle_signal_command(pair, timeframe=timeframe, expiration=expiration, strategy=strategy)
                 print("----- SIGNAL -----")
                 print(f"{res.get('signal')} for {res.get('user_symbol')} (deriv: {res.get('symbol')})")
                 print("Price:", res.get('last_price'))
@@ -238,8 +2633,15 @@ async def main_console():
                 continue
             print("unknown command. Type help")
     finally:
-        if not listener_task.done():
-            listener_task.cancel()
+        if engine:
+            engine.stop()
+        stop_services(tasks)
 
 if __name__ == "__main__":
-    asyncio.run(main_console())
+    parser = argparse.ArgumentParser(description="Manual signal generator using Deriv market data.")
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help="shard symbols across this many worker processes (0 = single process)")
+    parser.add_argument("--shared-memory", metavar="PREFIX", default=SHARED_MEMORY_PREFIX,
+                        help="publish tick rings in shared memory for SharedTickReader")
+    args = parser.parse_args()
+    asyncio.run(main_console(workers=args.workers, shared_prefix=args.shared_memory))